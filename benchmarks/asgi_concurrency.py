@@ -0,0 +1,243 @@
+"""
+Requests/sec of the sync and async read endpoints under an ASGI server.
+
+Seeds a throwaway database, serves it with uvicorn in a child process and
+drives each endpoint pair from keep-alive connections at every requested
+concurrency level:
+
+    python -m benchmarks.asgi_concurrency --concurrency 1 50 500
+
+Requires uvicorn (`pip install uvicorn`); the client is plain asyncio so
+that it adds as little as possible to the measurement.
+"""
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from . import utils
+
+HOST = "127.0.0.1"
+
+
+def endpoints(ctx):
+    """
+    (label, sync paths, async paths) per endpoint; requests rotate through
+    the paths so that detail views are not served from one cache entry.
+    """
+    titles = ctx["title_ids"][:200]
+    return [
+        (
+            "movie-detail",
+            [f"/watch/{pk}/" for pk in titles],
+            [f"/watch/async/{pk}/" for pk in titles],
+        ),
+        (
+            "review-list",
+            [f"/watch/{ctx['popular_title']}/reviews/"],
+            [f"/watch/async/{ctx['popular_title']}/reviews/"],
+        ),
+        (
+            "user-review-detail",
+            ["/watch/reviews/?username=user1"],
+            ["/watch/async/reviews/?username=user1"],
+        ),
+        (
+            "search-list",
+            ["/watch/listsearch/?search=title"],
+            ["/watch/async/listsearch/?search=title"],
+        ),
+        ("streamplatform-list", ["/watch/stream/"], ["/watch/async/stream/"]),
+    ]
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    length = 0
+    chunked = False
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value:
+            chunked = True
+    if not chunked:
+        await reader.readexactly(length)
+        return status
+    while size := int((await reader.readline()).split(b";")[0], 16):
+        await reader.readexactly(size + 2)
+    await reader.readline()
+    return status
+
+
+async def worker(port, paths, offset, deadline, latencies, statuses):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+            status = await read_response(reader)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def measure(port, paths, concurrency, duration):
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *(
+            worker(port, paths, n, deadline, latencies, statuses)
+            for n in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": len(latencies) / elapsed,
+        **utils.percentiles(latencies),
+        "statuses": statuses,
+    }
+
+
+def serve(db_path, port):
+    """
+    Child process: serve the seeded database over HTTP.
+    """
+    import uvicorn
+
+    utils.setup(db_path)
+
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from rest_framework.throttling import SimpleRateThrottle
+
+    settings.ALLOWED_HOSTS = [HOST]
+
+    # Every throttle class shares this dict; keep them out of the way.
+    for scope in SimpleRateThrottle.THROTTLE_RATES:
+        SimpleRateThrottle.THROTTLE_RATES[scope] = "1000000000/day"
+
+    uvicorn.run(
+        get_asgi_application(),
+        host=HOST,
+        port=port,
+        log_level="warning",
+        lifespan="off",
+        # Room for the largest concurrency level.
+        backlog=4096,
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit("server exited during startup")
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    sys.exit("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--platforms", type=int, default=10)
+    parser.add_argument("--titles", type=int, default=500)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument(
+        "--duration", type=float, default=5, help="Seconds per measurement."
+    )
+    parser.add_argument("--only", help="Run only endpoints whose label contains this.")
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.port)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite3"
+        utils.setup(db_path)
+        utils.migrate()
+        utils.seed(
+            platforms=args.platforms,
+            titles=args.titles,
+            users=args.users,
+            reviews=args.reviews,
+        )
+
+        from watchlist_app.models import WatchList
+
+        ctx = {
+            "title_ids": list(
+                WatchList.objects.order_by("id").values_list("id", flat=True)
+            ),
+            "popular_title": WatchList.objects.order_by("-number_rating")
+            .values_list("id", flat=True)
+            .first(),
+        }
+
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.asgi_concurrency",
+                "--serve",
+                str(db_path),
+                "--port",
+                str(port),
+            ]
+        )
+        try:
+            wait_for(port, server)
+            print(
+                f"{'endpoint':<22}{'conns':>6}{'mode':>7}{'req/s':>10}"
+                f"{'p50 ms':>9}{'p95 ms':>9}  status"
+            )
+            for label, sync_paths, async_paths in endpoints(ctx):
+                if args.only and args.only not in label:
+                    continue
+                for concurrency in args.concurrency:
+                    for mode, paths in (("sync", sync_paths), ("async", async_paths)):
+                        result = asyncio.run(
+                            measure(port, paths, concurrency, args.duration)
+                        )
+                        print(
+                            f"{label:<22}{concurrency:>6}{mode:>7}"
+                            f"{result['rps']:>10.0f}{result['p50']:>9.1f}"
+                            f"{result['p95']:>9.1f}  {result['statuses']}",
+                            flush=True,
+                        )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
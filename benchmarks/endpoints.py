@@ -0,0 +1,437 @@
+"""
+Drive every route of the watchlist and account APIs in-process.
+
+Seeds a throwaway database with `seed_catalog`, then times each scenario
+and reports p50/p95/p99 latency, queries per request and allocations:
+
+    python -m benchmarks.endpoints --save baseline.json
+    python -m benchmarks.endpoints --compare baseline.json
+
+Comparison exits non-zero when a route's p95 grows by more than
+--tolerance or it issues more queries than the baseline. Any run exits
+non-zero, without saving, when a scenario answers anything but its
+expected status: error paths are not the latency being measured.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from . import utils
+
+
+class Scenario:
+    """
+    One request against `route`. `build(ctx, i)` returns the client call for
+    iteration `i` and may do untimed setup first. `expected` is the status
+    every response must have, by default 201 for POST and 200 otherwise.
+    """
+
+    def __init__(self, route, method, build, label=None, expected=None):
+        self.route = route
+        self.method = method
+        self.build = build
+        self.label = label or f"{method} {route}"
+        if expected is None:
+            expected = 201 if method == "POST" else 200
+        self.expected = expected
+
+
+def scenarios():
+    def get(route, path, label=None):
+        return Scenario(
+            route, "GET", lambda ctx, i: (path(ctx, i), None, ctx.staff), label
+        )
+
+    def review_create(ctx, i):
+        # A fresh (user, title) pair each time: one review per user per title.
+        user = ctx.users[i % len(ctx.users)]
+        title = ctx.title_ids[-1 - i // len(ctx.users)]
+        return f"/watch/{title}/review-create", ctx.review, user
+
+    def review_bulk_create(ctx, i):
+        from rest_framework.authtoken.models import Token
+
+        # A fresh user so every item in the batch is accepted.
+        token = Token.objects.get(user=ctx.fresh_user(f"bulk{i}"))
+        batch = [
+            {"watchlist": ctx.title(i + n), **ctx.review} for n in range(ctx.batch)
+        ]
+        return "/watch/reviews/bulk/", batch, token.key
+
+    def logout(ctx, i):
+        from rest_framework.authtoken.models import Token
+
+        # Creating the user also creates its token, see user_app.models.
+        token = Token.objects.get(user=ctx.fresh_user(f"logout{i}"))
+        return "/account/logout/", None, token.key
+
+    def token_refresh(ctx, i):
+        return "/account/api/token/refresh/", {"refresh": ctx.refresh}, None
+
+    return [
+        get("api-root", lambda ctx, i: "/watch/"),
+        get("movie-list", lambda ctx, i: "/watch/list/"),
+        get(
+            "movie-list",
+            lambda ctx, i: "/watch/list/?size=10",
+            "GET movie-list size=10",
+        ),
+        Scenario(
+            "movie-list",
+            "GET",
+            lambda ctx, i: ("/watch/list/", None, None),
+            "GET movie-list anonymous",
+        ),
+        get("movie-detail", lambda ctx, i: f"/watch/{ctx.title(i)}/"),
+        get("streamplatform-list", lambda ctx, i: "/watch/stream/"),
+        Scenario(
+            "streamplatform-list",
+            "GET",
+            lambda ctx, i: ("/watch/stream/", None, None),
+            "GET streamplatform-list anonymous",
+        ),
+        get(
+            "streamplatform-detail", lambda ctx, i: f"/watch/stream/{ctx.platform(i)}/"
+        ),
+        get(
+            "streamplatform-top",
+            lambda ctx, i: f"/watch/stream/{ctx.platform(i)}/top/?limit=20",
+        ),
+        get(
+            "search-list",
+            lambda ctx, i: "/watch/listsearch/?search=title",
+            "GET search-list broad",
+        ),
+        get(
+            "search-list",
+            lambda ctx, i: f"/watch/listsearch/?search={i}",
+            "GET search-list selective",
+        ),
+        get("review-list", lambda ctx, i: f"/watch/{ctx.popular_title}/reviews/"),
+        Scenario(
+            "review-list",
+            "GET",
+            lambda ctx, i: (f"/watch/{ctx.popular_title}/reviews/", None, ctx.jwt),
+            "GET review-list jwt",
+        ),
+        get(
+            "review-detail",
+            lambda ctx, i: f"/watch/review/{ctx.review_ids[i % len(ctx.review_ids)]}/",
+        ),
+        get("user-review-detail", lambda ctx, i: "/watch/reviews/?username=user0"),
+        get("cache-stats", lambda ctx, i: "/watch/cache-stats/"),
+        get("metrics", lambda ctx, i: "/watch/metrics/"),
+        get("async-movie-detail", lambda ctx, i: f"/watch/async/{ctx.title(i)}/"),
+        get("async-streamplatform-list", lambda ctx, i: "/watch/async/stream/"),
+        get(
+            "async-streamplatform-detail",
+            lambda ctx, i: f"/watch/async/stream/{ctx.platform(i)}/",
+        ),
+        get(
+            "async-search-list",
+            lambda ctx, i: f"/watch/async/listsearch/?search={i}",
+        ),
+        get(
+            "async-review-list",
+            lambda ctx, i: f"/watch/async/{ctx.popular_title}/reviews/",
+        ),
+        get(
+            "async-user-review-detail",
+            lambda ctx, i: "/watch/async/reviews/?username=user0",
+        ),
+        Scenario(
+            "movie-list",
+            "POST",
+            lambda ctx, i: ("/watch/list/", ctx.title_data(i), ctx.staff),
+            # WatchListAP answers 200, not 201.
+            expected=200,
+        ),
+        Scenario(
+            "movie-detail",
+            "PUT",
+            lambda ctx, i: (f"/watch/{ctx.title(i)}/", ctx.title_data(i), ctx.staff),
+        ),
+        Scenario(
+            "streamplatform-list",
+            "POST",
+            lambda ctx, i: ("/watch/stream/", ctx.platform_data(i), ctx.staff),
+        ),
+        Scenario(
+            "streamplatform-detail",
+            "PUT",
+            lambda ctx, i: (
+                f"/watch/stream/{ctx.platform(i)}/",
+                ctx.platform_data(i),
+                ctx.staff,
+            ),
+        ),
+        Scenario("review-create", "POST", review_create),
+        Scenario(
+            "review-bulk-create",
+            "POST",
+            review_bulk_create,
+            "POST review-bulk-create 100",
+        ),
+        Scenario(
+            "review-detail",
+            "PUT",
+            lambda ctx, i: (
+                f"/watch/review/{ctx.review_ids[i % len(ctx.review_ids)]}/",
+                ctx.review,
+                ctx.staff,
+            ),
+        ),
+        Scenario(
+            "register",
+            "POST",
+            lambda ctx, i: (
+                "/account/register/",
+                {
+                    "username": f"register{i}",
+                    "email": f"register{i}@example.com",
+                    "password": "password",
+                    "password2": "password",
+                },
+                None,
+            ),
+        ),
+        Scenario(
+            "login",
+            "POST",
+            lambda ctx, i: ("/account/login/", ctx.credentials, None),
+            expected=200,
+        ),
+        Scenario("logout", "POST", logout, expected=200),
+        Scenario(
+            "token_obtain_pair",
+            "POST",
+            lambda ctx, i: ("/account/api/token/", ctx.credentials, None),
+            expected=200,
+        ),
+        Scenario("token_refresh", "POST", token_refresh, expected=200),
+    ]
+
+
+class Context:
+    def __init__(self):
+        from django.contrib.auth.models import User
+        from rest_framework.authtoken.models import Token
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from user_app.api.serializers import ClaimsTokenObtainPairSerializer
+        from watchlist_app.models import StreamPlatform, WatchList, Review
+
+        staff = User.objects.get(username="user0")
+        staff.is_staff = True
+        staff.save()
+        self.staff = Token.objects.get(user=staff).key
+        self.users = list(
+            Token.objects.exclude(user=staff).values_list("key", flat=True)
+        )
+        self.credentials = {"username": "user0", "password": "password"}
+        self.refresh = str(RefreshToken.for_user(staff))
+        self.jwt = "Bearer " + str(
+            ClaimsTokenObtainPairSerializer.get_token(staff).access_token
+        )
+        self.title_ids = list(
+            WatchList.objects.order_by("id").values_list("id", flat=True)
+        )
+        self.platform_ids = list(StreamPlatform.objects.values_list("id", flat=True))
+        self.review_ids = list(
+            Review.objects.filter(review_user=staff).values_list("id", flat=True)
+        )
+        self.popular_title = (
+            WatchList.objects.order_by("-number_rating")
+            .values_list("id", flat=True)
+            .first()
+        )
+        self.review = {"rating": 4, "description": "bench", "active": True}
+        self.batch = 100
+
+    def title(self, i):
+        return self.title_ids[i % len(self.title_ids)]
+
+    def platform(self, i):
+        return self.platform_ids[i % len(self.platform_ids)]
+
+    def title_data(self, i):
+        return {
+            "title": f"bench {i}",
+            "storyline": "bench",
+            "platform": self.platform(i),
+        }
+
+    def platform_data(self, i):
+        return {
+            "name": f"bench {i}",
+            "about": "bench",
+            "website": "https://example.com",
+        }
+
+    def fresh_user(self, username):
+        from django.contrib.auth.models import User
+
+        return User.objects.create(username=username)
+
+
+def uncovered_routes(covered):
+    from django.urls import URLPattern, URLResolver, get_resolver
+
+    def names(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.app_name != "admin":
+                    yield from names(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                yield pattern.name
+
+    return sorted(set(names(get_resolver().url_patterns)) - covered)
+
+
+def request(client, method, path, data, token):
+    # A bare key is a DRF token; anything else is a full header value.
+    if token and " " not in token:
+        token = f"Token {token}"
+    client.credentials(**({"HTTP_AUTHORIZATION": token} if token else {}))
+    return getattr(client, method.lower())(path, data, format="json")
+
+
+def run(scenario, ctx, iterations, counter):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    # Report server errors as 500s instead of aborting the whole run.
+    client = APIClient(raise_request_exception=False)
+    timings = []
+    statuses = set()
+    for _ in range(iterations):
+        i = next(counter)
+        args = scenario.build(ctx, i)
+        with utils.Timer() as timer:
+            response = request(client, scenario.method, *args)
+        timings.append(timer.elapsed * 1000)
+        statuses.add(response.status_code)
+
+    # A separate instrumented request: tracing skews the timed ones.
+    args = scenario.build(ctx, next(counter))
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        request(client, scenario.method, *args)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        **utils.percentiles(timings),
+        "queries": len(queries),
+        "alloc_kb": peak / 1024,
+        "statuses": sorted(statuses),
+    }
+
+
+def unexpected(scenarios, results):
+    """
+    Return the labels of the scenarios that answered another status than
+    `expected`, 5xx included.
+    """
+    return [
+        scenario.label
+        for scenario in scenarios
+        if results[scenario.label]["statuses"] != [scenario.expected]
+    ]
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(
+        f"\n{'scenario':<36}{'p95 ms':>10}{'base':>10}{'change':>9}{'queries':>9}{'base':>6}"
+    )
+    for label, result in results.items():
+        base = baseline.get(label)
+        if base is None:
+            continue
+        change = result["p95"] / base["p95"] - 1 if base["p95"] else 0
+        flag = ""
+        if change > tolerance or result["queries"] > base["queries"]:
+            flag = "  REGRESSION"
+            regressions.append(label)
+        print(
+            f"{label:<36}{result['p95']:>10.2f}{base['p95']:>10.2f}{change:>+9.0%}"
+            f"{result['queries']:>9}{base['queries']:>6}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--platforms", type=int, default=20)
+    parser.add_argument("--titles", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--only", help="Run only scenarios whose label contains this.")
+    parser.add_argument("--save", help="Write results to this JSON file.")
+    parser.add_argument("--compare", help="Compare against a saved JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.setup(Path(tmp) / "bench.sqlite3")
+        utils.migrate()
+        utils.seed(
+            platforms=args.platforms,
+            titles=args.titles,
+            users=args.users,
+            reviews=args.reviews,
+        )
+
+        from itertools import count
+        from rest_framework.throttling import SimpleRateThrottle
+
+        # Every throttle class shares this dict; keep them out of the way.
+        for scope in SimpleRateThrottle.THROTTLE_RATES:
+            SimpleRateThrottle.THROTTLE_RATES[scope] = "1000000/day"
+
+        ctx = Context()
+        selected = [
+            scenario
+            for scenario in scenarios()
+            if not args.only or args.only in scenario.label
+        ]
+        missing = uncovered_routes({scenario.route for scenario in scenarios()})
+        if missing:
+            print(f"warning: no scenario for {', '.join(missing)}", file=sys.stderr)
+
+        counter = count()
+        results = {}
+        print(
+            f"{'scenario':<36}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'alloc KB':>10}  status"
+        )
+        for scenario in selected:
+            result = results[scenario.label] = run(
+                scenario, ctx, args.iterations, counter
+            )
+            print(
+                f"{scenario.label:<36}{result['p50']:>9.2f}{result['p95']:>9.2f}"
+                f"{result['p99']:>9.2f}{result['queries']:>9}"
+                f"{result['alloc_kb']:>10.1f}  {result['statuses']}"
+            )
+
+    failed = unexpected(selected, results)
+    if failed:
+        print(f"unexpected status: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Users/sec of `provision_users` for a growing number of hashing processes,
+against registering the same users one at a time:
+
+    python -m benchmarks.provision --users 200 --workers 1 2 4 8
+
+Uses the configured PASSWORD_HASHERS, so the numbers reflect the real
+hashing cost.
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from . import utils
+
+
+def rows(prefix, count):
+    for i in range(count):
+        yield {
+            "username": f"{prefix}{i}",
+            "email": f"{prefix}{i}@example.com",
+            "password": f"password-{i}",
+        }
+
+
+def register(prefix, count):
+    from user_app.api.serializers import RegistrationSerializer
+
+    for row in rows(prefix, count):
+        serializer = RegistrationSerializer(data={**row, "password2": row["password"]})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+
+def provision(path, prefix, count, workers):
+    from django.core.management import call_command
+
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows(prefix, count)))
+    call_command("provision_users", str(path), workers=workers, stdout=io.StringIO())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.setup(Path(tmp) / "bench.sqlite3")
+        utils.migrate()
+
+        print(f"{os.cpu_count()} CPUs, {args.users} users per run")
+        print(f"{'method':<24}{'seconds':>10}{'users/s':>10}")
+        with utils.Timer() as timer:
+            register("registered", args.users)
+        print(
+            f"{'registration':<24}{timer.elapsed:>10.2f}"
+            f"{args.users / timer.elapsed:>10.0f}"
+        )
+        for workers in args.workers:
+            with utils.Timer() as timer:
+                provision(
+                    Path(tmp) / "users.jsonl", f"w{workers}_", args.users, workers
+                )
+            print(
+                f"{f'provision_users -w {workers}':<24}{timer.elapsed:>10.2f}"
+                f"{args.users / timer.elapsed:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compare DRF's JSON renderer and parser with the fast ones, with and
+without orjson, on payloads taken from a seeded catalog:
+
+    python -m benchmarks.renderers --reviews 10000
+"""
+
+import argparse
+import io
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from . import utils
+
+
+def payloads(reviews):
+    from watchlist_app.api import serializers
+    from watchlist_app.models import Review, StreamPlatform, WatchList
+
+    review_rows = serializers.ReviewValuesSerializer.values(
+        Review.objects.order_by("id")[:reviews]
+    )
+    page = serializers.WatchListValuesSerializer.values(
+        WatchList.objects.order_by("created", "id")[:10]
+    )
+    return {
+        "review list": serializers.ReviewValuesSerializer(review_rows).data,
+        "catalog page": {
+            "next": "http://testserver/watch/list/?record=cD0yMDI0",
+            "previous": None,
+            "results": serializers.WatchListValuesSerializer(page).data,
+        },
+        "platform list": serializers.StreamPlatformSerializer(
+            StreamPlatform.objects.prefetch_related("watchlist"), many=True
+        ).data,
+        "bulk reviews": [
+            {"watchlist": i, "rating": i % 5 + 1, "description": "fine ü"}
+            for i in range(500)
+        ],
+    }
+
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def variants():
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from watchlist_app.api import parsers, renderers
+
+    no_orjson = [
+        mock.patch.object(renderers, "orjson", None),
+        mock.patch.object(parsers, "orjson", None),
+    ]
+    yield "drf", JSONRenderer(), JSONParser(), []
+    yield "stdlib", renderers.FastJSONRenderer(), parsers.FastJSONParser(), no_orjson
+    if renderers.orjson is not None:
+        yield "orjson", renderers.FastJSONRenderer(), parsers.FastJSONParser(), []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.setup(Path(tmp) / "bench.sqlite3")
+        utils.migrate()
+        utils.seed(
+            platforms=20,
+            titles=2000,
+            users=max(args.reviews // 100, 1),
+            reviews=args.reviews,
+        )
+
+        print(
+            f"{'payload':<15}{'KB':>8}{'variant':>9}{'render ms':>11}"
+            f"{'parse ms':>10}{'render MB/s':>13}"
+        )
+        for label, data in payloads(args.reviews).items():
+            expected = None
+            for name, renderer, json_parser, patches in variants():
+                for patch in patches:
+                    patch.start()
+                try:
+                    render, body = best_of(args.repeat, lambda: renderer.render(data))
+                    parse, _ = best_of(
+                        args.repeat, lambda: json_parser.parse(io.BytesIO(body))
+                    )
+                finally:
+                    for patch in patches:
+                        patch.stop()
+
+                if expected is None:
+                    expected = body
+                elif body != expected:
+                    raise SystemExit(f"{label}: {name} output differs from drf")
+                print(
+                    f"{label:<15}{len(body) / 1024:>8.0f}{name:>9}"
+                    f"{render * 1000:>11.2f}{parse * 1000:>10.2f}"
+                    f"{len(body) / render / 2**20:>13.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
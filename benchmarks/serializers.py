@@ -0,0 +1,110 @@
+"""
+Rows/sec of the DRF list serializers against their `values()` counterparts.
+
+Seeds a throwaway database, then serializes and renders pages of reviews
+and titles both ways, checking that the JSON is identical:
+
+    python -m benchmarks.serializers --page-size 10000
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from . import utils
+
+
+def cases():
+    from watchlist_app.api import serializers
+    from watchlist_app.models import Review, WatchList
+
+    return [
+        (
+            "reviews",
+            Review.objects.select_related("review_user"),
+            serializers.ReviewSerializer,
+            Review.objects.all(),
+            serializers.ReviewValuesSerializer,
+        ),
+        (
+            "watchlists",
+            WatchList.objects.select_related("platform"),
+            serializers.WatchListSerializer,
+            WatchList.objects.all(),
+            serializers.WatchListValuesSerializer,
+        ),
+    ]
+
+
+def measure(queryset, serializer, repeat):
+    """
+    Best-of-`repeat` timings of fetching, serializing and rendering
+    `queryset`, and the rendered body.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    renderer = JSONRenderer()
+    best = {"fetch": float("inf"), "serialize": float("inf"), "render": float("inf")}
+    for _ in range(repeat):
+        with utils.Timer() as fetch:
+            rows = list(queryset.all())
+        with utils.Timer() as serialize:
+            data = serializer(rows, many=True).data
+        with utils.Timer() as render:
+            body = renderer.render(data)
+        for name, timer in (
+            ("fetch", fetch),
+            ("serialize", serialize),
+            ("render", render),
+        ):
+            best[name] = min(best[name], timer.elapsed)
+    return {
+        "rows/s": len(rows) / sum(best.values()),
+        **{f"{name} ms": elapsed * 1000 for name, elapsed in best.items()},
+    }, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.setup(Path(tmp) / "bench.sqlite3")
+        utils.migrate()
+        utils.seed(
+            platforms=10,
+            titles=args.page_size,
+            users=max(args.page_size // 100, 1),
+            reviews=args.page_size,
+        )
+
+        print(
+            f"{'page':<12}{'serializer':<10}{'rows/s':>10}{'fetch ms':>10}"
+            f"{'serialize ms':>14}{'render ms':>11}"
+        )
+        for label, queryset, serializer, values_queryset, values_serializer in cases():
+            bodies = []
+            for name, rows, cls in (
+                ("drf", queryset, serializer),
+                (
+                    "values",
+                    values_serializer.values(values_queryset),
+                    values_serializer,
+                ),
+            ):
+                rows = rows.order_by("id")[: args.page_size]
+                result, body = measure(rows, cls, args.repeat)
+                bodies.append(body)
+                print(
+                    f"{label:<12}{name:<10}{result['rows/s']:>10.0f}"
+                    f"{result['fetch ms']:>10.1f}{result['serialize ms']:>14.1f}"
+                    f"{result['render ms']:>11.1f}"
+                )
+            if bodies[0] != bodies[1]:
+                raise SystemExit(f"{label}: the two serializers disagree")
+
+
+if __name__ == "__main__":
+    main()
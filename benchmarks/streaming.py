@@ -0,0 +1,110 @@
+"""
+Compare buffered and streamed JSON list responses.
+
+Each measurement runs in a fresh interpreter so the reported peak RSS
+belongs to a single request rather than to the seeding step:
+
+    python -m benchmarks.streaming --reviews 200000
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from . import utils
+
+ENDPOINTS = {
+    "user-reviews": "/watch/reviews/?username=user0",
+    "platforms": "/watch/stream/",
+}
+
+
+def seed(db_path, reviews):
+    utils.setup(db_path)
+    utils.migrate()
+    # A single user owns every review so /watch/reviews/ returns all of them.
+    utils.seed(
+        platforms=max(reviews // 10, 1), titles=reviews, users=1, reviews=reviews
+    )
+
+
+def measure(db_path, endpoint, stream):
+    utils.setup(db_path)
+    from django.test import Client
+
+    url = ENDPOINTS[endpoint]
+    if stream:
+        url += ("&" if "?" in url else "?") + "stream=true"
+
+    rss_before = utils.peak_rss_kb()
+    with utils.Timer() as total:
+        response = Client().get(url)
+        if response.streaming:
+            chunks = iter(response.streaming_content)
+            size = len(next(chunks))
+            ttfb = utils.time.perf_counter() - total.start
+            size += sum(len(chunk) for chunk in chunks)
+        else:
+            ttfb = utils.time.perf_counter() - total.start
+            size = len(response.content)
+
+    return {
+        "endpoint": endpoint,
+        "mode": "stream" if stream else "buffered",
+        "status": response.status_code,
+        "bytes": size,
+        "ttfb_ms": ttfb * 1000,
+        "total_ms": total.elapsed * 1000,
+        "peak_rss_mb": utils.peak_rss_kb() / 1024,
+        "rss_growth_mb": (utils.peak_rss_kb() - rss_before) / 1024,
+    }
+
+
+def run_child(*args):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.streaming", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output) if output else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--seed", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--endpoint", choices=ENDPOINTS, help=argparse.SUPPRESS)
+    parser.add_argument("--stream", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        return seed(args.db, args.reviews)
+    if args.endpoint:
+        return print(json.dumps(measure(args.db, args.endpoint, args.stream)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.sqlite3")
+        run_child("--seed", "--db", db_path, "--reviews", str(args.reviews))
+        print(
+            f"{'endpoint':<14}{'mode':<10}{'bytes':>12}{'ttfb ms':>10}"
+            f"{'total ms':>10}{'peak RSS MB':>13}{'growth MB':>11}"
+        )
+        for endpoint in ENDPOINTS:
+            for stream in (False, True):
+                flags = ["--db", db_path, "--endpoint", endpoint]
+                result = run_child(*flags, *(["--stream"] if stream else []))
+                print(
+                    f"{result['endpoint']:<14}{result['mode']:<10}"
+                    f"{result['bytes']:>12}{result['ttfb_ms']:>10.1f}"
+                    f"{result['total_ms']:>10.1f}{result['peak_rss_mb']:>13.1f}"
+                    f"{result['rss_growth_mb']:>11.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
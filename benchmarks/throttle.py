@@ -0,0 +1,77 @@
+"""
+Per-check overhead of the review throttles.
+
+Compares DRF's history-list UserRateThrottle on the local-memory cache with
+the token-bucket throttle on each store, all for one busy user:
+
+    python -m benchmarks.throttle --checks 20000
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from . import utils
+
+
+def run(throttle_class, checks, request, view):
+    throttle = throttle_class()
+    with utils.Timer() as timer:
+        for _ in range(checks):
+            throttle.allow_request(request, view)
+    return timer.elapsed / checks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.setup(Path(tmp) / "bench.sqlite3")
+        utils.migrate()
+
+        from django.contrib.auth.models import User
+        from django.core.cache import cache
+        from django.test import override_settings
+        from rest_framework.test import APIRequestFactory
+        from rest_framework.request import Request
+        from rest_framework.throttling import UserRateThrottle
+        from watchlist_app.api import throttling
+
+        # A rate high enough that no check is rejected.
+        rate = f"{args.checks * 10}/day"
+
+        class HistoryThrottle(UserRateThrottle):
+            def get_rate(self):
+                return rate
+
+        class BucketThrottle(throttling.TokenBucketUserRateThrottle):
+            def get_rate(self):
+                return rate
+
+        request = Request(APIRequestFactory().get("/"))
+        request.user = User.objects.create_user(username="bench")
+        cache.clear()
+
+        results = [
+            (
+                "UserRateThrottle, locmem history",
+                run(HistoryThrottle, args.checks, request, None),
+            )
+        ]
+        stores = {
+            "token bucket, database": "watchlist_app.api.throttling.DatabaseThrottleStore",
+            "token bucket, locmem cache": "watchlist_app.api.throttling.CacheThrottleStore",
+        }
+        for label, backend in stores.items():
+            with override_settings(THROTTLE_STORE={"BACKEND": backend}):
+                results.append((label, run(BucketThrottle, args.checks, request, None)))
+
+        print(f"{'throttle':<36}{'us/check':>10}")
+        for label, micros in results:
+            print(f"{label:<36}{micros:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks never touch the development database: they run against a
+throwaway SQLite file that is migrated and seeded on demand.
+"""
+
+import io
+import os
+import resource
+import statistics
+import time
+
+import django
+
+
+def setup(db_path=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "watchmate.settings")
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connections
+    from django.test.utils import setup_test_environment
+
+    if db_path is not None:
+        connections["default"].settings_dict["NAME"] = str(db_path)
+    # Keep query logging out of the measurements and allow the test client host.
+    setup_test_environment(debug=False)
+    settings.DEBUG = False
+
+
+def migrate():
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def seed(**options):
+    from django.core.management import call_command
+
+    call_command("seed_catalog", stdout=io.StringIO(), **options)
+
+
+def peak_rss_kb():
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    quantiles = (
+        statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    )
+    return {
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "p99": quantiles[98],
+    }
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.start
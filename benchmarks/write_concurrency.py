@@ -0,0 +1,165 @@
+"""
+Concurrent review posting against one SQLite file, from several processes.
+
+Each process posts reviews through `ReviewCreate` with its own users, so
+every request is a valid write. Runs the stock SQLite setup (rollback
+journal, no retries, a connection per request) and the "production"
+database profile from settings (WAL and pragmas, persistent connections)
+with lock retries on copies of the same seeded file:
+
+    python -m benchmarks.write_concurrency --processes 8 --requests 200
+"""
+
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from . import utils
+
+# The stock profile: Django's defaults and none of watchlist_app.sqlite.
+STOCK = {"pragmas": {}, "retries": 0, "conn_max_age": 0}
+
+
+def production():
+    from django.conf import settings
+
+    profile = settings.DATABASE_PROFILES["production"]
+    return {
+        "pragmas": profile["PRAGMAS"],
+        "retries": settings.WATCHLIST_SQLITE_LOCK_RETRIES,
+        "conn_max_age": profile["CONN_MAX_AGE"],
+    }
+
+
+def apply(profile, path):
+    from django.conf import settings
+    from django.db import connections
+
+    connections.close_all()
+    connections["default"].settings_dict["NAME"] = str(path)
+    connections["default"].settings_dict["CONN_MAX_AGE"] = profile["conn_max_age"]
+    settings.WATCHLIST_SQLITE_PRAGMAS = profile["pragmas"]
+    settings.WATCHLIST_SQLITE_LOCK_RETRIES = profile["retries"]
+
+
+def worker(profile, path, tokens, title_ids, requests, barrier, results):
+    from rest_framework.test import APIClient
+
+    apply(profile, path)
+    client = APIClient(raise_request_exception=False)
+    statuses = Counter()
+    timings = []
+    barrier.wait()
+    with utils.Timer() as total:
+        for i in range(requests):
+            # A different (user, title) pair for every request.
+            token = tokens[i % len(tokens)]
+            title = title_ids[i // len(tokens)]
+            client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+            with utils.Timer() as timer:
+                response = client.post(
+                    f"/watch/{title}/review-create",
+                    {"rating": 4, "description": "bench", "active": True},
+                    format="json",
+                )
+            timings.append(timer.elapsed * 1000)
+            statuses[response.status_code] += 1
+    results.put((statuses, timings, total.elapsed))
+
+
+def run(profile, path, users, title_ids, args):
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(args.processes)
+    results = context.Queue()
+    apply(profile, path)
+    processes = [
+        context.Process(
+            target=worker,
+            args=(
+                profile,
+                path,
+                users[n],
+                title_ids,
+                args.requests,
+                barrier,
+                results,
+            ),
+        )
+        for n in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    statuses = sum((result[0] for result in collected), Counter())
+    timings = [timing for result in collected for timing in result[1]]
+    wall = max(result[2] for result in collected)
+    return statuses, utils.percentiles(timings), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--users", type=int, default=10, help="Per process.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = Path(tmp) / "seed.sqlite3"
+        utils.setup(seeded)
+        profiles = {"stock": STOCK, "production": production()}
+        apply(STOCK, seeded)
+        utils.migrate()
+        utils.seed(platforms=5, titles=args.requests, users=10, reviews=0)
+
+        from django.contrib.auth.models import User
+        from django.db import connections
+        from rest_framework.authtoken.models import Token
+        from rest_framework.throttling import SimpleRateThrottle
+        from watchlist_app.models import WatchList
+
+        for scope in SimpleRateThrottle.THROTTLE_RATES:
+            SimpleRateThrottle.THROTTLE_RATES[scope] = "1000000/day"
+
+        users = []
+        for n in range(args.processes):
+            for k in range(args.users):
+                User.objects.create(username=f"writer{n}_{k}")
+            users.append(
+                list(
+                    Token.objects.filter(
+                        user__username__startswith=f"writer{n}_"
+                    ).values_list("key", flat=True)
+                )
+            )
+        title_ids = list(WatchList.objects.order_by("id").values_list("id", flat=True))
+        connections.close_all()
+
+        print(
+            f"{args.processes} processes x {args.requests} reviews, "
+            f"{multiprocessing.cpu_count()} CPUs"
+        )
+        print(
+            f"{'profile':<12}{'created':>9}{'errors':>8}{'reviews/s':>11}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for name, profile in profiles.items():
+            path = Path(tmp) / f"{name}.sqlite3"
+            shutil.copy(seeded, path)
+            statuses, latency, wall = run(profile, path, users, title_ids, args)
+            created = statuses.pop(201, 0)
+            print(
+                f"{name:<12}{created:>9}{sum(statuses.values()):>8}"
+                f"{created / wall:>11.0f}{latency['p50']:>9.1f}"
+                f"{latency['p95']:>9.1f}{latency['p99']:>9.1f}"
+                + (f"  {dict(statuses)}" if statuses else "")
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+from django.utils.functional import cached_property
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import cache
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    `TokenAuthentication` that caches the resolved `(user, token)` pair.
+
+    Entries are dropped when the token is deleted or the user is saved;
+    anything else (e.g. queryset updates) is bounded by the cache TTL.
+    """
+
+    def authenticate_credentials(self, key):
+        credentials = cache.get_cache().get(cache.token_key(key))
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            cache.get_cache().set(cache.token_key(key), credentials)
+        return credentials
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` that caches the user looked up from the token claims.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user = cache.get_cache().get(cache.user_key(user_id))
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.get_cache().set(cache.user_key(user_id), user)
+        elif jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                "The user's password has been changed.", code="password_changed"
+            )
+        return user
+
+
+class LazyTokenUser:
+    """
+    The user of a JWT, built from the token's verified claims.
+
+    `id`, `pk`, `username` and `is_staff` come from the claims that
+    `ClaimsTokenObtainPairSerializer` adds. Any other attribute loads the
+    `User` row, once, through `CachedJWTAuthentication`.
+    """
+
+    is_anonymous = False
+    is_authenticated = True
+
+    def __init__(self, token):
+        self.token = token
+
+    def __str__(self):
+        return self.username
+
+    @cached_property
+    def id(self):
+        return self.token[jwt_settings.USER_ID_CLAIM]
+
+    @property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def username(self):
+        return self.token["username"]
+
+    @cached_property
+    def is_staff(self):
+        return self.token.get("is_staff", False)
+
+    def get_username(self):
+        return self.username
+
+    @cached_property
+    def user(self):
+        return CachedJWTAuthentication().get_user(self.token)
+
+    def __getattr__(self, attr):
+        # Only reached for attributes not defined above.
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyTokenUser) or hasattr(other, "_meta"):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    `CachedJWTAuthentication` that authenticates safe requests from the
+    token alone, with a `LazyTokenUser`. Other requests, and tokens issued
+    without the claims, get the `User` row.
+
+    The claims are as fresh as the access token: a user deactivated or
+    stripped of is_staff keeps them until it expires.
+    """
+
+    def authenticate(self, request):
+        # DRF builds the authenticators for each request.
+        self.stateless = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if (
+            getattr(self, "stateless", False)
+            and not jwt_settings.CHECK_REVOKE_TOKEN
+            and jwt_settings.USER_ID_CLAIM in validated_token
+            and "username" in validated_token
+        ):
+            return LazyTokenUser(validated_token)
+        return super().get_user(validated_token)
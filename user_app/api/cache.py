@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.cache import caches
+
+
+def get_cache():
+    return caches[getattr(settings, "AUTH_CACHE_ALIAS", "default")]
+
+
+def token_key(key):
+    return f"auth:token:{key}"
+
+
+def user_key(pk):
+    return f"auth:user:{pk}"
+
+
+def invalidate_token(key):
+    get_cache().delete(token_key(key))
+
+
+def invalidate_user(pk, token_keys=()):
+    get_cache().delete_many([user_key(pk), *(token_key(key) for key in token_keys)])
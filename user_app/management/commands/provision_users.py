@@ -0,0 +1,140 @@
+import csv
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.authtoken.models import Token
+
+from user_app.passwords import PasswordHasherPool
+from watchmate import rows as row_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users and their auth tokens from a JSONL or CSV file of "
+        "username, email and password rows, hashing passwords across a "
+        "process pool. Rows whose username or email is taken, or that do "
+        "not validate, are skipped."
+    )
+
+    # Rows reported individually before only the count is kept.
+    max_reported = 20
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=row_files.FORMATS,
+            help="Defaults to the file extension, else jsonl.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Hashing processes. Defaults to the number of CPUs.",
+        )
+
+    def handle(self, path, **options):
+        self.skipped = 0
+        # Taken so far, in the database or earlier in the file.
+        self.usernames = set()
+        self.emails = set()
+
+        start = time.perf_counter()
+        provisioned = 0
+        stream = sys.stdin if path == "-" else open(path, newline="")
+        try:
+            rows = row_files.read_rows(
+                stream, row_files.guess_format(path, options["format"])
+            )
+            with PasswordHasherPool(options["workers"]) as pool:
+                workers = pool.workers
+                while batch := list(islice(rows, options["batch_size"])):
+                    users, passwords = self.build(batch)
+                    for user, encoded in zip(users, pool.hash(passwords)):
+                        user.password = encoded
+                    if users:
+                        self.insert(users)
+                    provisioned += len(users)
+        except (ValueError, csv.Error, IntegrityError) as exc:
+            # Earlier batches are already committed.
+            raise CommandError(f"{path}: {exc} (after {provisioned} users)")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - start
+        rate = provisioned / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Provisioned {provisioned} users, skipped {self.skipped}, in "
+                f"{elapsed:.1f}s ({rate:.0f} users/s on {workers} workers)"
+            )
+        )
+
+    def skip(self, line, message):
+        self.skipped += 1
+        if self.skipped <= self.max_reported:
+            self.stderr.write(f"line {line}: {message}")
+
+    def build(self, batch):
+        """
+        Return the unsaved users of `batch` and their plain passwords,
+        checking every username and email against the database in one query.
+        """
+        normalize = User.objects.normalize_email
+        usernames = {row.get("username") for line, row in batch} - {None}
+        # Compared as create_user() stores them, with the domain lowercased.
+        emails = {normalize(row.get("email") or "") for line, row in batch} - {""}
+        for username, email in User.objects.filter(
+            Q(username__in=usernames) | Q(email__in=emails)
+        ).values_list("username", "email"):
+            self.usernames.add(username)
+            self.emails.add(normalize(email))
+
+        users, passwords = [], []
+        for line, row in batch:
+            username = row.get("username")
+            email = normalize(row.get("email") or "")
+            password = row.get("password")
+            if not password:
+                self.skip(line, "missing password")
+            elif username in self.usernames:
+                self.skip(line, f"username {username!r} already exists")
+            elif email and email in self.emails:
+                self.skip(line, f"email {email!r} already exists")
+            else:
+                user = User(username=username, email=email)
+                try:
+                    user.clean_fields(exclude=["password"])
+                except ValidationError as exc:
+                    self.skip(line, "; ".join(exc.messages))
+                    continue
+                self.usernames.add(username)
+                self.emails.add(email)
+                users.append(user)
+                passwords.append(str(password))
+        return users, passwords
+
+    def insert(self, users):
+        # bulk_create() sends no post_save, so the tokens that
+        # user_app.models.create_auth_token would add are inserted here.
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            if users[0].pk is None:
+                # Backends that cannot return ids from a bulk insert.
+                ids = dict(
+                    User.objects.filter(
+                        username__in=[user.username for user in users]
+                    ).values_list("username", "id")
+                )
+                for user in users:
+                    user.pk = ids[user.username]
+            Token.objects.bulk_create(
+                Token(user=user, key=Token.generate_key()) for user in users
+            )
@@ -2,12 +2,48 @@ from django.db import models
 
 # Create your models here.
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
+from .api import cache
+
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+# Entries are dropped after commit: dropping them earlier would let a
+# concurrent request cache the old user or token again before the write
+# commits.
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token_auth(sender, instance=None, using="default", **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: cache.invalidate_token(key), using=using)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_auth(
+    sender, instance=None, created=False, using="default", **kwargs
+):
+    if created:
+        return
+    pk = instance.pk
+
+    def invalidate():
+        token_keys = Token.objects.filter(user_id=pk).values_list("key", flat=True)
+        cache.invalidate_user(pk, token_keys)
+
+    transaction.on_commit(invalidate, using=using)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_deleted_user_auth(sender, instance=None, using="default", **kwargs):
+    # Its tokens are deleted with it and drop their own entries.
+    pk = instance.pk
+    transaction.on_commit(lambda: cache.invalidate_user(pk), using=using)
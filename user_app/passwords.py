@@ -0,0 +1,59 @@
+"""
+Password hashing spread over a process pool, for creating users in bulk.
+
+Hashers are slow on purpose, so hashing dominates bulk user creation.
+Worker processes hash on every core whether or not the hasher releases
+the GIL.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+
+
+def _init_worker(settings_module):
+    # Forked workers inherit a configured Django; spawned ones start bare.
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+        django.setup()
+
+
+class PasswordHasherPool:
+    """
+    Hash passwords with `make_password()` across `workers` processes, or
+    in this process when `workers` is 1.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE"),),
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def hash(self, passwords):
+        """
+        Return the encoded hashes of `passwords`, in order.
+        """
+        if self.executor is None:
+            return [make_password(password) for password in passwords]
+        # A few chunks per worker keeps them all busy to the end of a batch.
+        chunksize = max(len(passwords) // (self.workers * 4), 1)
+        return list(self.executor.map(make_password, passwords, chunksize=chunksize))
@@ -1,9 +1,27 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
 from django.urls import reverse
 
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APITestCase, APIRequestFactory
 from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .api import cache
+from .api.authentication import (
+    CachedTokenAuthentication,
+    CachedJWTAuthentication,
+    ClaimsJWTAuthentication,
+    LazyTokenUser,
+)
 
 
 # Create your tests here.
@@ -33,3 +51,224 @@ class LoginLogoutTestCase(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
         response = self.client.post(reverse("logout"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CachedAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create_user(username="example", password="password")
+        self.token = Token.objects.get(user__username="example")
+
+    def test_token_cached(self):
+        auth = CachedTokenAuthentication()
+        with self.assertNumQueries(1):
+            auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_logout_invalidates_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(reverse("logout")).status_code, 200)
+        response = self.client.post(reverse("logout"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_save_invalidates(self):
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate_credentials(self.token.key)
+
+    def test_invalidated_after_commit(self):
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.user.is_active = False
+                self.user.save()
+                # Not yet committed: the cached user is still the live one,
+                # and is dropped only once the write commits.
+                with self.assertNumQueries(0):
+                    user, token = auth.authenticate_credentials(self.token.key)
+                self.assertTrue(user.is_active)
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate_credentials(self.token.key)
+
+    def test_jwt_user_cached(self):
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "example", "password": "password"},
+            format="json",
+        )
+        auth = CachedJWTAuthentication()
+        validated = auth.get_validated_token(response.data["access"])
+        with self.assertNumQueries(1):
+            auth.get_user(validated)
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.get_user(validated), self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            auth.get_user(validated)
+
+    def test_user_delete_invalidates(self):
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "example", "password": "password"},
+            format="json",
+        )
+        access = response.data["access"]
+        auth = CachedJWTAuthentication()
+        auth.get_user(auth.get_validated_token(access))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        response = self.client.post(reverse("review-create", args=(1,)))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ClaimsJWTAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create_user(
+            username="example", email="example@example.com", password="password"
+        )
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "example", "password": "password"},
+            format="json",
+        )
+        self.access = response.data["access"]
+        self.refresh = response.data["refresh"]
+
+    def authenticate(self, method, access=None):
+        request = getattr(APIRequestFactory(), method)(
+            "/", HTTP_AUTHORIZATION=f"Bearer {access or self.access}"
+        )
+        user, token = ClaimsJWTAuthentication().authenticate(request)
+        return user
+
+    def test_safe_request_reads_claims(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate("get")
+            self.assertIsInstance(user, LazyTokenUser)
+            self.assertEqual(
+                (user.pk, user.username, user.is_staff, user.is_authenticated),
+                (self.user.pk, "example", False, True),
+            )
+            self.assertEqual(user, self.user)
+            self.assertEqual(str(user), "example")
+        # Anything else loads the row, once.
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "example@example.com")
+            self.assertTrue(user.check_password("password"))
+
+    def test_read_endpoint(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        # The user and the page of UserReview, and nothing for authentication.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("user-review-detail"), {"username": "example"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unsafe_request_loads_user(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(type(self.authenticate("post")), User)
+
+    def test_token_without_claims(self):
+        access = str(RefreshToken.for_user(self.user).access_token)
+        with self.assertNumQueries(1):
+            self.assertEqual(type(self.authenticate("get", access)), User)
+
+    def test_refreshed_token_keeps_claims(self):
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": self.refresh}, format="json"
+        )
+        user = self.authenticate("get", response.data["access"])
+        self.assertIsInstance(user, LazyTokenUser)
+        self.assertEqual(user.username, "example")
+
+    def test_staff_claim(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "example", "password": "password"},
+            format="json",
+        )
+        self.assertTrue(self.authenticate("get", response.data["access"]).is_staff)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ProvisionUsersTestCase(APITestCase):
+    def setUp(self):
+        User.objects.create_user(
+            username="taken", email="taken@example.com", password="password"
+        )
+
+    def provision(self, rows, workers):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "users.jsonl"
+            path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+            out, err = StringIO(), StringIO()
+            call_command(
+                "provision_users",
+                str(path),
+                workers=workers,
+                batch_size=2,
+                stdout=out,
+                stderr=err,
+            )
+        return out.getvalue(), err.getvalue()
+
+    def test_provision(self):
+        rows = [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "password": "pw"}
+            for i in range(5)
+        ]
+        rows += [
+            {"username": "taken", "email": "new@example.com", "password": "pw"},
+            {"username": "other", "email": "taken@example.com", "password": "pw"},
+            {"username": "again", "email": "user0@example.com", "password": "pw"},
+            {"username": "user1", "email": "", "password": "pw"},
+            {"username": "bad name!", "email": "", "password": "pw"},
+            {"username": "nopassword", "email": ""},
+        ]
+        out, err = self.provision(rows, workers=2)
+        self.assertIn("Provisioned 5 users, skipped 6", out)
+        self.assertEqual(len(err.splitlines()), 6)
+
+        users = User.objects.filter(username__startswith="user")
+        self.assertEqual(users.count(), 5)
+        self.assertEqual(
+            Token.objects.filter(user__in=users).count(), 5, "every user has a token"
+        )
+        response = self.client.post(
+            reverse("login"), {"username": "user3", "password": "pw"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_email_domain_case(self):
+        out, err = self.provision(
+            [{"username": "other", "email": "taken@EXAMPLE.com", "password": "pw"}],
+            workers=1,
+        )
+        self.assertIn("Provisioned 0 users, skipped 1", out)
+        self.assertIn("'taken@example.com' already exists", err)
+
+    def test_in_process(self):
+        out, err = self.provision(
+            [{"username": "solo", "email": "solo@example.com", "password": "pw"}],
+            workers=1,
+        )
+        self.assertIn("on 1 workers", out)
+        self.assertTrue(User.objects.get(username="solo").check_password("pw"))
@@ -0,0 +1,197 @@
+"""
+Async counterparts of the read endpoints, served under /watch/async/.
+
+Their responses match the sync views. Under ASGI a request waiting on the
+database no longer holds a worker thread. Authentication, permission and
+throttle checks are DRF's synchronous code and run through sync_to_async.
+"""
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.db.models import Value
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.throttling import AnonRateThrottle
+from rest_framework.views import APIView
+from rest_framework import status
+
+from watchlist_app.models import WatchList, StreamPlatform, Review
+from .serializers import (
+    WatchListSerializer,
+    StreamPlatformSerializer,
+    ReviewValuesSerializer,
+    UserReviewValuesSerializer,
+    WatchListValuesSerializer,
+)
+from .permissions import IsAdminOrReadOnly
+from .throttling import ReviewListThrottle
+from .filters import FullTextSearchFilter
+from .pagination import WatchListCursorPagination, ReviewFeedPagination
+from .conditional import conditional_get
+from . import cache
+
+
+class AsyncAPIView(APIView):
+    """
+    `APIView` whose handlers are coroutines.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Follows APIView.dispatch().
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            # OPTIONS and the 405 handler stay synchronous.
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = handler(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncGenericAPIView(AsyncAPIView, generics.GenericAPIView):
+    pass
+
+
+class AsyncUserReview(AsyncGenericAPIView):
+    serializer_class = UserReviewValuesSerializer
+    pagination_class = ReviewFeedPagination
+
+    async def get(self, request, *args, **kwargs):
+        username = request.query_params.get("username")
+        user = await User.objects.filter(username=username).only("id").afirst()
+        if user is None:
+            queryset = Review.objects.none()
+        else:
+            queryset = UserReviewValuesSerializer.values(
+                Review.objects.filter(review_user_id=user.id).annotate(
+                    review_user_name=Value(username)
+                )
+            )
+        # CursorPagination evaluates the page itself.
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class AsyncReviewList(AsyncGenericAPIView):
+    serializer_class = ReviewValuesSerializer
+
+    throttle_classes = [ReviewListThrottle, AnonRateThrottle]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["review_user__username", "active"]
+
+    def get_queryset(self):
+        pk = self.kwargs["pk"]
+        return ReviewValuesSerializer.values(Review.objects.filter(watchlist_id=pk))
+
+    validator_models = (Review,)
+
+    @conditional_get
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        reviews = [review async for review in queryset]
+        return Response(self.get_serializer(reviews, many=True).data)
+
+
+class AsyncWatchListSearch(AsyncGenericAPIView):
+    queryset = WatchListValuesSerializer.values(WatchList.objects.all())
+    serializer_class = WatchListValuesSerializer
+    filter_backends = [FullTextSearchFilter]
+    search_fields = ["title", "platform__name"]
+    pagination_class = WatchListCursorPagination
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # CursorPagination evaluates the page itself.
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class AsyncWatchListDetail(AsyncAPIView):
+    permission_classes = [IsAdminOrReadOnly]
+
+    async def get(self, request, pk):
+        data = await cache.aget_or_set(
+            cache.watchlist_key(pk), lambda: self.serialize(pk)
+        )
+        if data is None:
+            return Response(
+                {"message": "Movie not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(data)
+
+    async def serialize(self, pk):
+        movie = (
+            await WatchList.objects.select_related("platform").filter(id=pk).afirst()
+        )
+        if movie is None:
+            return None
+
+        serializer = WatchListSerializer(movie)
+        return serializer.data
+
+
+class AsyncStreamPlatformList(AsyncAPIView):
+    permission_classes = [IsAdminOrReadOnly]
+
+    # Titles embed their ratings, which reviews update.
+    validator_models = (StreamPlatform, WatchList, Review)
+
+    @conditional_get
+    async def get(self, request):
+        platforms = [
+            platform
+            async for platform in StreamPlatform.objects.prefetch_related("watchlist")
+        ]
+        serializer = StreamPlatformSerializer(
+            platforms, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
+
+class AsyncStreamPlatformDetail(AsyncAPIView):
+    permission_classes = [IsAdminOrReadOnly]
+
+    async def get(self, request, pk):
+        data = await cache.aget_or_set(
+            cache.platform_key(pk), lambda: self.serialize(request, pk)
+        )
+        if data is None:
+            raise NotFound()
+
+        return Response(data)
+
+    async def serialize(self, request, pk):
+        stream = (
+            await StreamPlatform.objects.prefetch_related("watchlist")
+            .filter(id=pk)
+            .afirst()
+        )
+        if stream is None:
+            return None
+
+        serializer = StreamPlatformSerializer(stream, context={"request": request})
+        return serializer.data
@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from watchlist_app import routers
+from watchlist_app.models import StreamPlatform, WatchList
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[getattr(settings, "WATCHLIST_CACHE_ALIAS", "default")]
+
+
+def watchlist_key(pk):
+    return f"watchlist:detail:{pk}"
+
+
+def platform_key(pk):
+    return f"platform:detail:{pk}"
+
+
+def get_or_set(key, default):
+    """
+    Return the cached value for `key`, calling `default()` on a miss.
+
+    A `None` result from `default` (object not found) is not cached.
+    `default` reads from the primary database.
+    """
+    cache = get_cache()
+    data = cache.get(key)
+    if data is not None:
+        stats.hits += 1
+        return data
+
+    stats.misses += 1
+    with routers.primary_reads():
+        data = default()
+    if data is not None:
+        cache.set(key, data)
+    return data
+
+
+async def aget_or_set(key, default):
+    """
+    Async version of `get_or_set()`; `default` is a coroutine function.
+    """
+    cache = get_cache()
+    data = await cache.aget(key)
+    if data is not None:
+        stats.hits += 1
+        return data
+
+    stats.misses += 1
+    with routers.primary_reads():
+        data = await default()
+    if data is not None:
+        await cache.aset(key, data)
+    return data
+
+
+def invalidate_watchlists(*pks):
+    get_cache().delete_many([watchlist_key(pk) for pk in pks])
+
+
+def invalidate_platforms(*pks):
+    get_cache().delete_many([platform_key(pk) for pk in pks])
+
+
+def invalidate_catalog(batch_size=1000):
+    """
+    Drop the detail entries of every title and platform.
+    """
+    for model, invalidate in (
+        (WatchList, invalidate_watchlists),
+        (StreamPlatform, invalidate_platforms),
+    ):
+        pks = model.objects.order_by("pk").values_list("pk", flat=True)
+        for i in range(0, pks.count(), batch_size):
+            invalidate(*pks[i : i + batch_size])
+
+
+def is_process_local():
+    """
+    Whether the cache lives in this process only, so that invalidating it
+    from a management command leaves the server's copy untouched.
+    """
+    return isinstance(get_cache(), LocMemCache)
+
+
+PROCESS_LOCAL_WARNING = (
+    "The watchlist cache is local to each process: running servers keep "
+    "serving cached titles, platforms and lists until their entries expire. "
+    "Configure a shared cache backend to invalidate them from here."
+)
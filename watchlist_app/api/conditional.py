@@ -0,0 +1,79 @@
+"""
+Conditional GETs for list endpoints.
+
+The validator of a list is derived from the version counters of the models
+whose rows appear in it, the ones `response_cache` keeps and the signals
+bump once a write commits. Checking it is a single cache read: no query
+is run and nothing is serialized. As for the response cache, the counters
+must live in a cache shared by every process.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from . import response_cache
+
+
+def _etag(request, versions):
+    state = [request.get_full_path(), *versions]
+    digest = hashlib.md5("|".join(state).encode(), usedforsecurity=False)
+    # Weak: equal validators promise equal content, not equal bytes.
+    return "W/" + quote_etag(digest.hexdigest())
+
+
+def etag(request, models):
+    """
+    Return the ETag of the list at `request`'s URL built from `models`.
+    """
+    return _etag(request, response_cache.versions(models))
+
+
+async def aetag(request, models):
+    """
+    Async version of `etag()`.
+    """
+    return _etag(request, await response_cache.aversions(models))
+
+
+def _finalize(response, etag):
+    if response.status_code in (200, 304):
+        response.headers["ETag"] = etag
+        # Clients may keep the body but must revalidate before reuse.
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_get(handler):
+    """
+    Wrap a view's GET handler so that it answers 304 Not Modified when the
+    client's If-None-Match still matches `view.validator_models`.
+    Coroutine handlers get a coroutine wrapper.
+
+    The counters carry no time, so no Last-Modified is sent and
+    If-Modified-Since alone never yields a 304.
+    """
+    if iscoroutinefunction(handler):
+
+        @wraps(handler)
+        async def async_wrapper(view, request, *args, **kwargs):
+            tag = await aetag(request, view.validator_models)
+            response = get_conditional_response(request, etag=tag)
+            if response is None:
+                response = await handler(view, request, *args, **kwargs)
+            return _finalize(response, tag)
+
+        return async_wrapper
+
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        tag = etag(request, view.validator_models)
+        response = get_conditional_response(request, etag=tag)
+        if response is None:
+            response = handler(view, request, *args, **kwargs)
+        return _finalize(response, tag)
+
+    return wrapper
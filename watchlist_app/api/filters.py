@@ -0,0 +1,37 @@
+from django.db.models import F
+from rest_framework import filters
+
+from watchlist_app import search
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    `SearchFilter` backed by the FTS5 index, ranking results by relevance.
+
+    Falls back to `SearchFilter` lookups on databases other than SQLite.
+    """
+
+    rank_field = "search_rank"
+
+    def get_match_expression(self, request, queryset):
+        if not search.is_supported(queryset.db):
+            return None
+        return search.match_expression(self.get_search_terms(request))
+
+    def filter_queryset(self, request, queryset, view):
+        if not search.is_supported(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        expression = self.get_match_expression(request, queryset)
+        if expression is None:
+            return queryset
+
+        return queryset.filter(search_index__document__match=expression).annotate(
+            **{self.rank_field: F("search_index__rank")}
+        )
+
+    def get_ordering(self, request, queryset, view):
+        # Consulted by CursorPagination in place of its fixed ordering.
+        if self.get_match_expression(request, queryset) is not None:
+            return (self.rank_field, "id")
+        return view.pagination_class.ordering
@@ -1,3 +1,9 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Field, Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import (
     PageNumberPagination,
     LimitOffsetPagination,
@@ -5,6 +11,15 @@ from rest_framework.pagination import (
 )
 
 
+class RowValue(Func):
+    """
+    The SQL row value `(a, b, ...)` of the given expressions.
+    """
+
+    template = "(%(expressions)s)"
+    output_field = Field()
+
+
 class WatchListPagination(PageNumberPagination):
     page_size = 5
     # page_query_param = "p"
@@ -19,7 +34,134 @@ class WatchListLOPagination(LimitOffsetPagination):
     offset_query_param = "start"
 
 
-class WatchListCursorPagination(CursorPagination):
+class KeysetCursorPagination(CursorPagination):
+    """
+    `CursorPagination` that seeks on the whole ordering.
+
+    DRF keeps only the first ordering field in the cursor, filters on it
+    and steps over ties with an OFFSET. Here the cursor position holds every
+    ordering field, and a page starts with one row-value comparison such as
+    `(created, id) > (%s, %s)`, which a composite index on the same columns
+    answers with a single seek. The ordering has to be unique and run in
+    one direction; positions then never tie and the offset stays 0.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # DRF's implementation, with `seek()` in place of its filter.
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = (0, False, None)
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(
+                *[
+                    name[1:] if name.startswith("-") else f"-{name}"
+                    for name in self.ordering
+                ]
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = self.seek(queryset, current_position, reverse)
+
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = list(results[: self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def seek(self, queryset, position, reverse):
+        """
+        Filter `queryset` to the rows after `position` in the direction of
+        the page.
+        """
+        names = [name.lstrip("-") for name in self.ordering]
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(names):
+                raise ValueError(position)
+            fields = [
+                F(name).resolve_expression(queryset.query).output_field
+                for name in names
+            ]
+            values = [
+                Value(field.to_python(value), output_field=field)
+                for field, value in zip(fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # As in DRF: (cursor reversed) XOR (ordering descending).
+        if reverse != self.ordering[0].startswith("-"):
+            lookup = LessThan
+        else:
+            lookup = GreaterThan
+        return queryset.filter(
+            lookup(RowValue(*[F(name) for name in names]), RowValue(*values))
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for name in ordering:
+            name = name.lstrip("-")
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            position.append(value if isinstance(value, (int, float)) else str(value))
+        return json.dumps(position, separators=(",", ":"))
+
+
+class WatchListCursorPagination(KeysetCursorPagination):
     page_size = 5
-    ordering = "created"
+    # Seeks on the (created, id) index; id breaks ties between equal timestamps.
+    ordering = ("created", "id")
     cursor_query_param = "record"
+    page_size_query_param = "size"
+    max_page_size = 10
+
+
+class ReviewFeedPagination(KeysetCursorPagination):
+    page_size = 10
+    # Seeks on the (review_user, created, id) index, newest first.
+    ordering = ("-created", "-id")
+    cursor_query_param = "record"
+    page_size_query_param = "size"
+    max_page_size = 50
@@ -0,0 +1,43 @@
+"""
+JSON parsing through orjson when it is installed.
+
+orjson rejects a few documents the stdlib accepts, such as lone surrogate
+escapes, and reads integers beyond 64 bits as floats.
+"""
+
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONParser(JSONParser):
+    """
+    `JSONParser` that decodes the body in one call: with orjson for UTF-8
+    bodies, otherwise with `json.loads()`.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        body = stream.read()
+
+        try:
+            # orjson never accepts NaN or infinities, like STRICT_JSON.
+            if (
+                orjson is not None
+                and self.strict
+                and codecs.lookup(encoding).name == "utf-8"
+            ):
+                return orjson.loads(body)
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(body.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,75 @@
+"""
+JSON rendering through orjson when it is installed.
+
+`dumps()` produces the same bytes as `JSONRenderer` with its default
+settings: compact, UTF-8, `\u2028` and `\u2029` escaped, UTC datetimes
+ending in "Z" and anything orjson does not know handed to DRF's encoder.
+Two things differ with orjson: floats that need an exponent are written
+as `1e16` rather than `1e+16` (the same number), and NaN and infinities
+become null where `JSONRenderer` raises. Without orjson, `dumps()` falls
+back to a single pre-built stdlib encoder.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The JSONRenderer defaults: COMPACT_JSON, UNICODE_JSON and STRICT_JSON.
+_encoder = encoders.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, separators=(",", ":")
+)
+
+if orjson is not None:
+    _default = encoders.JSONEncoder().default
+    _options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _stdlib_dumps(data):
+    ret = _encoder.encode(data)
+    # Valid JSON, but not valid JavaScript; see JSONRenderer.render().
+    if "\u2028" in ret or "\u2029" in ret:
+        ret = ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+    return ret.encode()
+
+
+def dumps(data):
+    """
+    Return `data` encoded as `JSONRenderer` would, as bytes.
+    """
+    if orjson is None:
+        return _stdlib_dumps(data)
+    try:
+        ret = orjson.dumps(data, default=_default, option=_options)
+    except orjson.JSONEncodeError:
+        # Integers beyond 64 bits, among others.
+        return _stdlib_dumps(data)
+    if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+        ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` that encodes through `dumps()`. Requests for indented
+    output and non-default JSON settings take the `JSONRenderer` path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            indent is not None
+            or self.encoder_class is not encoders.JSONEncoder
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
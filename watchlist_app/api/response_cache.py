@@ -0,0 +1,235 @@
+"""
+Rendered responses of anonymous list requests, served without the view.
+
+`ResponseCacheMiddleware` keeps the final bytes and headers of 200
+responses to anonymous GETs of the routes in ROUTES, keyed by the full URL
+(so pagination links keep their host), the Accept header and the version
+counters of the models the route shows. Saving or deleting a title,
+platform or review bumps its model's counter once the write commits,
+which retires every entry built from the old data at once; nothing is
+deleted. Writes that bypass signals call `bump()` themselves, after
+their transaction.
+
+With WATCHLIST_RESPONSE_CACHE_GZIP a gzipped copy is stored with the body
+and sent to clients that accept it.
+
+Requests with credentials, a session cookie or conditional headers, and
+streamed responses, always go through the view. A request that fills the
+cache reads the primary, not a replica, so that a lagging replica cannot
+store old rows under a new version.
+"""
+
+import gzip
+import hashlib
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+from django.utils.cache import patch_vary_headers
+
+from watchlist_app import routers
+from watchlist_app.models import Review, StreamPlatform, WatchList
+from . import cache
+
+VERSION_KEYS = {
+    WatchList: "version:watchlist",
+    StreamPlatform: "version:platform",
+    Review: "version:review",
+}
+
+# Route name -> the models whose rows appear in its responses.
+ROUTES = {
+    "movie-list": (WatchList, StreamPlatform, Review),
+    "streamplatform-list": (StreamPlatform, WatchList, Review),
+    "search-list": (WatchList, StreamPlatform, Review),
+}
+
+# Bodies shorter than this are not worth compressing.
+GZIP_MIN_LENGTH = 200
+
+_accepts_gzip = re.compile(r"\bgzip\b")
+
+_BYPASS_HEADERS = (
+    "HTTP_AUTHORIZATION",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+)
+
+
+def timeout():
+    return getattr(settings, "WATCHLIST_RESPONSE_CACHE_TIMEOUT", 300)
+
+
+def gzip_enabled():
+    return getattr(settings, "WATCHLIST_RESPONSE_CACHE_GZIP", False)
+
+
+def bump(*models):
+    """
+    Retire the cached responses that show rows of `models`.
+    """
+    store = cache.get_cache()
+    for model in models:
+        try:
+            store.incr(VERSION_KEYS[model])
+        except ValueError:
+            # Never set or evicted: start from a value no entry was built on.
+            store.add(VERSION_KEYS[model], time.time_ns(), None)
+
+
+def _versions(models, found):
+    """
+    Return the counters of `models` from `found`, and the ones to create.
+    """
+    versions, missing = [], {}
+    for model in models:
+        key = VERSION_KEYS[model]
+        if key not in found:
+            found[key] = missing[key] = time.time_ns()
+        versions.append(str(found[key]))
+    return versions, missing
+
+
+def versions(models):
+    """
+    Return the counters of `models` as strings, creating the missing ones.
+    """
+    store = cache.get_cache()
+    found = store.get_many([VERSION_KEYS[model] for model in models])
+    versions, missing = _versions(models, found)
+    for key, value in missing.items():
+        store.add(key, value, None)
+    return versions
+
+
+async def aversions(models):
+    """
+    Async version of `versions()`.
+    """
+    store = cache.get_cache()
+    found = await store.aget_many([VERSION_KEYS[model] for model in models])
+    versions, missing = _versions(models, found)
+    for key, value in missing.items():
+        await store.aadd(key, value, None)
+    return versions
+
+
+def _key(request, route, versions):
+    url = request.build_absolute_uri()
+    accept = request.META.get("HTTP_ACCEPT", "")
+    digest = hashlib.md5(f"{url}\n{accept}".encode()).hexdigest()
+    return f"response:{route}:{'.'.join(versions)}:{digest}"
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve anonymous GETs of ROUTES from rendered bytes in the watchlist
+    cache. Place it after SecurityMiddleware, whose headers are then added
+    to every response rather than stored.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Path -> ResolverMatch, resolved on first use.
+        self._matches = None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def match(self, request):
+        if self._matches is None:
+            self._matches = {path: resolve(path) for path in map(reverse, ROUTES)}
+        if request.method != "GET" or any(
+            header in request.META for header in _BYPASS_HEADERS
+        ):
+            return None
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        return self._matches.get(request.path_info)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        match = self.match(request)
+        if match is None:
+            return self.get_response(request)
+
+        store = cache.get_cache()
+        key = _key(request, match.url_name, versions(ROUTES[match.url_name]))
+
+        entry = store.get(key)
+        if entry is not None:
+            return self.respond(request, match, entry)
+        with routers.primary_reads():
+            response = self.get_response(request)
+        entry = self.entry(response)
+        if entry is not None:
+            store.set(key, entry, timeout())
+        return response
+
+    async def __acall__(self, request):
+        match = self.match(request)
+        if match is None:
+            return await self.get_response(request)
+
+        store = cache.get_cache()
+        key = _key(request, match.url_name, await aversions(ROUTES[match.url_name]))
+
+        entry = await store.aget(key)
+        if entry is not None:
+            return self.respond(request, match, entry)
+        with routers.primary_reads():
+            response = await self.get_response(request)
+        entry = self.entry(response)
+        if entry is not None:
+            await store.aset(key, entry, timeout())
+        return response
+
+    def entry(self, response):
+        """
+        Return what to store of `response`, or None if it must not be
+        shared.
+        """
+        if (
+            response.status_code != 200
+            or response.streaming
+            or response.cookies
+            or response.has_header("Content-Encoding")
+        ):
+            return None
+        compressed = None
+        if gzip_enabled() and len(response.content) >= GZIP_MIN_LENGTH:
+            patch_vary_headers(response, ["Accept-Encoding"])
+            compressed = gzip.compress(response.content, mtime=0)
+        return {
+            "content": response.content,
+            "gzip": compressed,
+            # Set from the body that is actually sent, see respond().
+            "headers": [
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower() != "content-length"
+            ],
+        }
+
+    def respond(self, request, match, entry):
+        # Lets TimingMiddleware report the route.
+        request.resolver_match = match
+        response = HttpResponse(entry["content"], headers=dict(entry["headers"]))
+        if entry["gzip"] is not None and _accepts_gzip.search(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        ):
+            response.content = entry["gzip"]
+            response.headers["Content-Encoding"] = "gzip"
+            etag = response.headers.get("ETag")
+            if etag and etag.startswith('"'):
+                # As GZipMiddleware: the bytes differ from the strong tag's.
+                response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Length"] = str(len(response.content))
+        return response
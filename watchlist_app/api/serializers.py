@@ -1,24 +1,102 @@
 from rest_framework import serializers
+from watchlist_app.metrics import TimedListSerializer, TimedSerializerMixin
 from watchlist_app.models import WatchList, StreamPlatform, Review
+from watchlist_app.ratings import HISTOGRAM_COLUMNS, STARS, star_column
+from .values import ValuesSerializer
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     review_user = serializers.StringRelatedField(read_only=True)
 
     class Meta:
         model = Review
         exclude = ["watchlist"]
+        list_serializer_class = TimedListSerializer
         # fields = "__all__"
 
 
-class WatchListSerializer(serializers.ModelSerializer):
+class ReviewValuesSerializer(ValuesSerializer):
+    serializer_class = ReviewSerializer
+    # str(User) is the username.
+    lookups = {"review_user": "review_user__username"}
+
+
+class UserReviewSerializer(ReviewSerializer):
+    watchlist_title = serializers.CharField(source="watchlist.title", read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        pass
+
+
+class UserReviewValuesSerializer(ValuesSerializer):
+    serializer_class = UserReviewSerializer
+    # The feed is for one user, whose name the view annotates on every row
+    # instead of joining auth_user.
+    lookups = {"review_user": "review_user_name"}
+
+
+class BulkReviewSerializer(ReviewSerializer):
+    # A plain id: existence is checked once for the whole batch.
+    watchlist = serializers.IntegerField(source="watchlist_id")
+
+    class Meta:
+        model = Review
+        fields = "__all__"
+        list_serializer_class = TimedListSerializer
+
+
+class RatingHistogramField(serializers.Field):
+    """
+    A title's `{"1": count, ..., "5": count}` star histogram, read from its
+    per-star columns; `active=True` counts active reviews only.
+    """
+
+    def __init__(self, active=False, **kwargs):
+        # See api.values.ValuesSerializer.
+        self.value_lookups = [star_column(stars, active) for stars in STARS]
+        kwargs.update(source="*", read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return self.from_values(
+            *(getattr(instance, column) for column in self.value_lookups)
+        )
+
+    def from_values(self, *counts):
+        return {str(stars): count for stars, count in zip(STARS, counts)}
+
+
+class PlatformNameField(serializers.PrimaryKeyRelatedField):
+    """
+    A title's platform, shown by name and written by id. A `platform.name`
+    source reads the same but cannot be saved by ModelSerializer.
+    """
+
+    def use_pk_only_optimization(self):
+        return False
+
+    def to_representation(self, value):
+        return value.name
+
+
+class WatchListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     # len_name = serializers.SerializerMethodField()
     # reviews = ReviewSerializer(many=True, read_only=True)
-    platform = serializers.CharField(source="platform.name")
+    platform = PlatformNameField(queryset=StreamPlatform.objects.all())
+    rating_histogram = RatingHistogramField()
+    active_rating_histogram = RatingHistogramField(active=True)
 
     class Meta:
         model = WatchList
-        fields = "__all__"
+        # The per-star columns are served as the two histograms.
+        exclude = HISTOGRAM_COLUMNS
+        read_only_fields = [
+            "avg_rating",
+            "number_rating",
+            "total_rating",
+            "weighted_rating",
+        ]
+        list_serializer_class = TimedListSerializer
         # fields = ["id","name","description"]
         # exclude = ["active"]
 
@@ -26,8 +104,13 @@ class WatchListSerializer(serializers.ModelSerializer):
     #     return len(obj.title)
 
 
+class WatchListValuesSerializer(ValuesSerializer):
+    serializer_class = WatchListSerializer
+    lookups = {"platform": "platform__name"}
+
+
 # class StreamPlatformSerializer(serializers.HyperlinkedModelSerializer):
-class StreamPlatformSerializer(serializers.ModelSerializer):
+class StreamPlatformSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     watchlist = WatchListSerializer(many=True, read_only=True)
     # watchlist = serializers.HyperlinkedRelatedField(
     #     many=True, read_only=True, view_name="movie-detail"
@@ -36,6 +119,7 @@ class StreamPlatformSerializer(serializers.ModelSerializer):
     class Meta:
         model = StreamPlatform
         fields = "__all__"
+        list_serializer_class = TimedListSerializer
 
 
 # def name_length(value):
@@ -0,0 +1,56 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+from .renderers import dumps
+
+STREAM_QUERY_PARAM = "stream"
+CHUNK_SIZE = 500
+
+
+def stream_requested(request):
+    value = request.query_params.get(STREAM_QUERY_PARAM, "")
+    return value.lower() in ("1", "true", "yes")
+
+
+def iter_json(queryset, serializer_class, context=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield `queryset` as a JSON array, one encoded chunk of rows at a time.
+
+    Rows are fetched with a server-side cursor `chunk_size` at a time, so at
+    most one chunk of model instances and serialized data is alive at once.
+    The encoding matches `FastJSONRenderer`.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    separator = b"["
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        data = serializer_class(chunk, many=True, context=context).data
+        yield separator + b",".join(dumps(item) for item in data)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def streaming_response(queryset, serializer_class, context=None):
+    return StreamingHttpResponse(
+        iter_json(queryset, serializer_class, context),
+        content_type="application/json",
+    )
+
+
+class StreamingListMixin:
+    """
+    Serve `list()` as an unpaginated streamed JSON array when the request
+    opts in with `?stream=true`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not stream_requested(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return streaming_response(
+            queryset, self.get_serializer_class(), self.get_serializer_context()
+        )
@@ -1,9 +1,178 @@
-from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
+import random
 
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import (
+    SimpleRateThrottle,
+    UserRateThrottle,
+    ScopedRateThrottle,
+)
 
-class ReviewCreateThrottle(UserRateThrottle):
+from watchlist_app.models import ThrottleBucket
+from watchlist_app.sqlite import retry_on_lock
+
+
+class ThrottleStore:
+    """
+    Storage for GCRA buckets: one theoretical arrival time (TAT) per key.
+    """
+
+    def consume(self, key, now, interval, burst):
+        """
+        Admit one request and return None, or return the seconds to wait.
+
+        `interval` is the time one request "costs" and `burst` the window
+        that may be spent up front, i.e. the rate's full duration.
+        """
+        raise NotImplementedError(".consume() must be overridden")
+
+    def expire(self, now):
+        """
+        Drop the buckets whose TAT has passed and return how many were
+        dropped. Such a bucket admits the same requests as a missing one.
+        """
+        return 0
+
+
+class DatabaseThrottleStore(ThrottleStore):
+    """
+    Buckets in the `ThrottleBucket` table, shared by every worker process.
+
+    An admitted request is a single conditional UPDATE, so concurrent
+    workers never race on a read-modify-write cycle. Creating a bucket
+    expires the passed ones with probability `expire_probability`, which
+    keeps the table at about the number of recently active keys.
+    """
+
+    # Rounds of UPDATE / SELECT / INSERT before giving up on a key that
+    # other workers keep creating and draining.
+    max_attempts = 3
+
+    def __init__(self, using="default", expire_probability=0.01):
+        self.using = using
+        self.expire_probability = expire_probability
+
+    @retry_on_lock
+    def consume(self, key, now, interval, burst):
+        buckets = ThrottleBucket.objects.using(self.using)
+        # Admit while the TAT is no further ahead than burst - interval.
+        limit = now + burst - interval
+        for _ in range(self.max_attempts):
+            admitted = buckets.filter(key=key, tat__lte=limit).update(
+                tat=Greatest(F("tat"), Value(now)) + interval
+            )
+            if admitted:
+                return None
+
+            tat = buckets.filter(key=key).values_list("tat", flat=True).first()
+            if tat is not None and tat > limit:
+                return tat - limit
+            if tat is not None:
+                # The bucket was created or drained since the UPDATE.
+                continue
+
+            try:
+                with transaction.atomic(using=self.using):
+                    buckets.create(key=key, tat=now + interval)
+            except IntegrityError:
+                # Another worker created the bucket first.
+                continue
+            if random.random() < self.expire_probability:
+                self.expire(now)
+            return None
+        # Contended throughout: have the client wait one request's cost.
+        return interval
+
+    def expire(self, now):
+        deleted, _ = (
+            ThrottleBucket.objects.using(self.using).filter(tat__lt=now).delete()
+        )
+        return deleted
+
+
+class CacheThrottleStore(ThrottleStore):
+    """
+    Buckets in a Django cache. Only consistent across processes when the
+    cache backend itself is shared, and not atomic under contention.
+    """
+
+    def __init__(self, alias="default"):
+        self.cache = caches[alias]
+
+    key_prefix = "bucket:"
+
+    def consume(self, key, now, interval, burst):
+        key = self.key_prefix + key
+        tat = max(self.cache.get(key, now), now)
+        limit = now + burst - interval
+        if tat > limit:
+            return tat - limit
+        self.cache.set(key, tat + interval, burst)
+        return None
+
+
+def get_store(read=False):
+    """
+    Return the store for unsafe requests, or with `read=True` the one for
+    safe requests, which should not turn every GET into a database write.
+    """
+    if read:
+        config = getattr(
+            settings,
+            "READ_THROTTLE_STORE",
+            {"BACKEND": "watchlist_app.api.throttling.CacheThrottleStore"},
+        )
+    else:
+        config = getattr(
+            settings,
+            "THROTTLE_STORE",
+            {"BACKEND": "watchlist_app.api.throttling.DatabaseThrottleStore"},
+        )
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    `SimpleRateThrottle` that keeps one GCRA timestamp per key in a
+    `ThrottleStore` instead of a request history list in the cache. Safe
+    and unsafe requests use separate stores, see `get_store()`.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        store = get_store(read=request.method in SAFE_METHODS)
+        self.wait_time = store.consume(
+            self.key, self.now, self.duration / self.num_requests, self.duration
+        )
+        return self.wait_time is None
+
+    def wait(self):
+        return self.wait_time
+
+
+class TokenBucketUserRateThrottle(TokenBucketThrottle, UserRateThrottle):
+    pass
+
+
+class TokenBucketScopedRateThrottle(ScopedRateThrottle, TokenBucketThrottle):
+    pass
+
+
+class ReviewCreateThrottle(TokenBucketUserRateThrottle):
     scope = "review-create"
 
 
-class ReviewListThrottle(UserRateThrottle):
+class ReviewListThrottle(TokenBucketUserRateThrottle):
     scope = "review-list"
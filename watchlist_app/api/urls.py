@@ -13,7 +13,18 @@ from .views import (
     ReviewList,
     ReviewDetail,
     ReviewCreate,
+    ReviewBulkCreate,
     UserReview,
+    CacheStatsAV,
+    MetricsAV,
+)
+from .async_views import (
+    AsyncWatchListSearch,
+    AsyncWatchListDetail,
+    AsyncStreamPlatformList,
+    AsyncStreamPlatformDetail,
+    AsyncReviewList,
+    AsyncUserReview,
 )
 
 router = DefaultRouter()
@@ -45,4 +56,34 @@ urlpatterns = [
     ),
     path("review/<int:pk>/", ReviewDetail.as_view(), name="review-detail"),
     path("reviews/", UserReview.as_view(), name="user-review-detail"),
+    path("reviews/bulk/", ReviewBulkCreate.as_view(), name="review-bulk-create"),
+    path("cache-stats/", CacheStatsAV.as_view(), name="cache-stats"),
+    path("metrics/", MetricsAV.as_view(), name="metrics"),
+    # Async versions of the read endpoints, for ASGI deployments.
+    path(
+        "async/<int:pk>/",
+        AsyncWatchListDetail.as_view(),
+        name="async-movie-detail",
+    ),
+    path(
+        "async/stream/",
+        AsyncStreamPlatformList.as_view(),
+        name="async-streamplatform-list",
+    ),
+    path(
+        "async/stream/<int:pk>/",
+        AsyncStreamPlatformDetail.as_view(),
+        name="async-streamplatform-detail",
+    ),
+    path(
+        "async/listsearch/",
+        AsyncWatchListSearch.as_view(),
+        name="async-search-list",
+    ),
+    path(
+        "async/<int:pk>/reviews/",
+        AsyncReviewList.as_view(),
+        name="async-review-list",
+    ),
+    path("async/reviews/", AsyncUserReview.as_view(), name="async-user-review-detail"),
 ]
@@ -0,0 +1,183 @@
+"""
+Read-only list serialization straight from `values()` rows.
+
+A `ValuesSerializer` mirrors the fields of a DRF serializer but never builds
+model instances: the queryset fetches just the columns those fields read,
+and each column goes through a converter compiled once per class. Plain
+columns are copied as they come from the database, so most of the cost of a
+row is building its dict. The output is the same as the DRF serializer's.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.serializers import ReturnList
+from rest_framework.settings import ISO_8601, api_settings
+
+from watchlist_app import metrics
+
+# Fields whose representation of a database value is the value itself.
+IDENTITY_FIELDS = (
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.EmailField,
+    serializers.URLField,
+    serializers.SlugField,
+    serializers.ReadOnlyField,
+)
+
+
+def _iso_datetime(tz):
+    def convert(value):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _datetime_converter(field):
+    """
+    Return a factory for DateTimeField's converter, or None when the field
+    needs its own to_representation(). The timezone is only known per
+    request, so the factory runs once per `.data`.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if (
+        type(field) is not serializers.DateTimeField
+        or not settings.USE_TZ
+        or output_format is None
+        or output_format.lower() != ISO_8601
+    ):
+        return None
+    if hasattr(field, "timezone"):
+        return lambda: _iso_datetime(field.timezone)
+    return lambda: _iso_datetime(timezone.get_current_timezone())
+
+
+class Plan:
+    def __init__(self, serializer_class, lookups):
+        serializer = serializer_class()
+        self.lookups = []
+        self.fields = []
+        self.builders = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            value_lookups = getattr(field, "value_lookups", None)
+            if value_lookups is not None:
+                for lookup in value_lookups:
+                    if lookup not in self.lookups:
+                        self.lookups.append(lookup)
+                # A placeholder that keeps the key in field order.
+                self.fields.append((name, value_lookups[0], None, None))
+                self.builders.append((name, value_lookups, field.from_values))
+                continue
+
+            lookup = lookups.get(name)
+            if lookup is None:
+                if (
+                    isinstance(
+                        field,
+                        (
+                            serializers.BaseSerializer,
+                            serializers.RelatedField,
+                            serializers.ManyRelatedField,
+                            serializers.SerializerMethodField,
+                        ),
+                    )
+                    or field.source == "*"
+                ):
+                    raise ImproperlyConfigured(
+                        f"{serializer_class.__name__}.{name} has no column; "
+                        "declare its lookup in `lookups`."
+                    )
+                lookup = "__".join(field.source_attrs)
+            if lookup not in self.lookups:
+                self.lookups.append(lookup)
+
+            # Declared lookups already hold the representation.
+            if name in lookups or type(field) in IDENTITY_FIELDS:
+                self.fields.append((name, lookup, None, None))
+                continue
+            factory = _datetime_converter(field)
+            if factory is not None:
+                self.fields.append((name, lookup, None, factory))
+            else:
+                self.fields.append((name, lookup, field.to_representation, None))
+
+    def converters(self):
+        """
+        Return `(columns, converters, builders)`: every `(name, lookup)` in
+        output order, `(name, convert)` for the fields that need converting
+        and `(name, lookups, build)` for the fields read from several columns.
+        """
+        columns = [(name, lookup) for name, lookup, _, _ in self.fields]
+        converters = [
+            (name, factory() if factory is not None else convert)
+            for name, _, convert, factory in self.fields
+            if convert is not None or factory is not None
+        ]
+        return columns, converters, self.builders
+
+
+class ValuesSerializer:
+    """
+    Read-only stand-in for `serializer_class(rows, many=True)`, for list
+    endpoints. `rows` are dicts from a queryset passed through `values()`,
+    which CursorPagination can read its position from, annotations included.
+
+    Columns are found through each field's `source`. Fields whose
+    representation is not a column path, such as `StringRelatedField`,
+    need an entry in `lookups` that yields the representation directly.
+    A field built from several columns can instead list them in its
+    `value_lookups` attribute and build its representation from their
+    values with `from_values(*values)`.
+    """
+
+    serializer_class = None
+    lookups = {}
+
+    def __init__(self, instance=None, data=empty, many=True, context=None):
+        if data is not empty:
+            raise TypeError(f"{type(self).__name__} is read-only")
+        self.instance = instance
+        self.many = True
+        self.context = context or {}
+
+    @classmethod
+    def plan(cls):
+        # Built on first use: the serializer's fields need the app registry.
+        if "_plan" not in cls.__dict__:
+            cls._plan = Plan(cls.serializer_class, cls.lookups)
+        return cls._plan
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls.plan().lookups)
+
+    def to_representation(self, rows):
+        columns, converters, builders = self.plan().converters()
+        data = []
+        for row in rows:
+            # Copy every column first so that keys keep the field order.
+            item = {name: row[lookup] for name, lookup in columns}
+            for name, convert in converters:
+                value = item[name]
+                if value is not None:
+                    item[name] = convert(value)
+            for name, lookups, build in builders:
+                item[name] = build(*[row[lookup] for lookup in lookups])
+            data.append(item)
+        return data
+
+    @property
+    def data(self):
+        with metrics.timed("serialize"):
+            data = self.to_representation(self.instance)
+        return ReturnList(data, serializer=self)
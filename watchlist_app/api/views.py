@@ -1,10 +1,31 @@
 from watchlist_app.models import WatchList, StreamPlatform, Review
-from .serializers import WatchListSerializer, StreamPlatformSerializer, ReviewSerializer
+from watchlist_app import metrics, ratings
+from watchlist_app.sqlite import retry_on_lock
+from .serializers import (
+    WatchListSerializer,
+    StreamPlatformSerializer,
+    ReviewSerializer,
+    BulkReviewSerializer,
+    ReviewValuesSerializer,
+    UserReviewValuesSerializer,
+    WatchListValuesSerializer,
+)
 from .permissions import IsAdminOrReadOnly, IsReviewUserOrReadOnly
-from .throttling import ReviewCreateThrottle, ReviewListThrottle
+from .throttling import (
+    ReviewCreateThrottle,
+    ReviewListThrottle,
+    TokenBucketScopedRateThrottle,
+)
+from . import cache, response_cache
+from .conditional import conditional_get
 
 # from rest_framework.decorators import api_view
-from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -12,21 +33,43 @@ from rest_framework import status
 from rest_framework import mixins
 from rest_framework import generics
 from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.throttling import (
     UserRateThrottle,
     AnonRateThrottle,
-    ScopedRateThrottle,
 )
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters
-from .pagination import WatchListPagination, WatchListCursorPagination
-
-
-class UserReview(generics.ListAPIView):
+from .filters import FullTextSearchFilter
+from .pagination import (
+    WatchListPagination,
+    WatchListCursorPagination,
+    ReviewFeedPagination,
+)
+from .streaming import StreamingListMixin, stream_requested, streaming_response
+
+
+def is_duplicate_review(exc):
+    """
+    Whether the IntegrityError `exc` was raised by unique_review_per_user.
+    """
+    diag = getattr(exc.__cause__, "diag", None)
+    if diag is not None:
+        # PostgreSQL names the violated constraint.
+        return diag.constraint_name == "unique_review_per_user"
+    # SQLite names its columns instead.
+    columns = ", ".join(
+        f"{Review._meta.db_table}.{Review._meta.get_field(name).column}"
+        for name in ("watchlist", "review_user")
+    )
+    message = str(exc)
+    return "unique_review_per_user" in message or columns in message
+
+
+class UserReview(StreamingListMixin, generics.ListAPIView):
     # permission_classes = [IsAuthenticated]
 
-    serializer_class = ReviewSerializer
+    serializer_class = UserReviewValuesSerializer
+    pagination_class = ReviewFeedPagination
     # throttle_classes = [ReviewCreateThrottle]
 
     # def get_queryset(self):
@@ -35,7 +78,17 @@ class UserReview(generics.ListAPIView):
 
     def get_queryset(self):
         username = self.request.query_params.get("username")
-        return Review.objects.filter(review_user__username=username)
+        # Resolved once, so that the page is a range of the user's index.
+        user_id = (
+            User.objects.filter(username=username).values_list("id", flat=True).first()
+        )
+        if user_id is None:
+            return Review.objects.none()
+        return UserReviewValuesSerializer.values(
+            Review.objects.filter(review_user_id=user_id)
+            .annotate(review_user_name=Value(username))
+            .order_by(*ReviewFeedPagination.ordering)
+        )
 
 
 class ReviewCreate(generics.CreateAPIView):
@@ -47,36 +100,138 @@ class ReviewCreate(generics.CreateAPIView):
     def get_queryset(self):
         return Review.objects.all()
 
+    # Retried from the parsed request data, with a fresh serializer.
+    @retry_on_lock
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         pk = self.kwargs.get("pk")
         watchlist = WatchList.objects.get(id=pk)
         # print(watchlist)
         review_user = self.request.user
 
-        review_queryset = Review.objects.filter(
-            watchlist=watchlist, review_user=review_user
-        )
-        # print(review_queryset)
-        if review_queryset.exists():
+        # The unique constraint on (watchlist, review_user) rejects duplicates.
+        try:
+            with transaction.atomic():
+                review = serializer.save(watchlist=watchlist, review_user=review_user)
+                ratings.review_created(watchlist.id, review.rating, review.active)
+        except IntegrityError as exc:
+            if not is_duplicate_review(exc):
+                raise
             raise ValidationError("you already have a review on this")
 
-        if watchlist.number_rating == 0:
-            watchlist.avg_rating = serializer.validated_data["rating"]
-        else:
-            watchlist.avg_rating = (
-                watchlist.avg_rating + serializer.validated_data["rating"]
-            ) / 2
 
-        watchlist.number_rating = watchlist.number_rating + 1
-        watchlist.save()
+class ReviewBulkCreate(APIView):
+    """
+    Create many reviews by the requesting user in one transaction.
+
+    Each item is validated on its own and failures are reported by index
+    without rejecting the rest of the batch. Rating aggregates are updated
+    once per affected title.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ReviewCreateThrottle]
+    max_batch_size = 500
+    max_attempts = 3
+
+    @retry_on_lock
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {"message": "Expected a list of reviews"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > self.max_batch_size:
+            return Response(
+                {"message": f"At most {self.max_batch_size} reviews per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        serializer.save(watchlist=watchlist, review_user=review_user)
+        errors = []
+        valid = []
+        for index, item in enumerate(request.data):
+            serializer = BulkReviewSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                errors.append({"index": index, "errors": serializer.errors})
+
+        for attempt in range(self.max_attempts):
+            reviews = self.build_reviews(request.user, valid, errors)
+            try:
+                with transaction.atomic():
+                    Review.objects.bulk_create(reviews)
+                    self.update_ratings(reviews)
+                break
+            except IntegrityError as exc:
+                # A concurrent request reviewed or deleted one of these
+                # titles; re-check the batch against the database.
+                if attempt == self.max_attempts - 1 or not (
+                    is_duplicate_review(exc) or "foreign key" in str(exc).lower()
+                ):
+                    raise
+
+        cache.invalidate_watchlists(*{review.watchlist_id for review in reviews})
+        cache.invalidate_platforms(*{review.platform_id for review in reviews})
+        response_cache.bump(Review)
+        return Response(
+            {
+                "created": BulkReviewSerializer(reviews, many=True).data,
+                "errors": sorted(errors, key=lambda error: error["index"]),
+            },
+            status=status.HTTP_201_CREATED if reviews else status.HTTP_400_BAD_REQUEST,
+        )
 
+    def build_reviews(self, user, valid, errors):
+        """
+        Turn validated items into unsaved reviews, moving items for unknown
+        titles and titles already reviewed by `user` into `errors`.
+        """
+        watchlist_ids = {data["watchlist_id"] for _, data in valid}
+        platforms = dict(
+            WatchList.objects.filter(id__in=watchlist_ids).values_list(
+                "id", "platform_id"
+            )
+        )
+        reviewed = set(
+            Review.objects.filter(
+                review_user=user, watchlist_id__in=watchlist_ids
+            ).values_list("watchlist_id", flat=True)
+        )
 
-class ReviewList(generics.ListAPIView):
+        reviews = []
+        kept = []
+        for index, data in valid:
+            watchlist_id = data["watchlist_id"]
+            if watchlist_id not in platforms:
+                message = "Movie not found"
+            elif watchlist_id in reviewed:
+                message = "you already have a review on this"
+            else:
+                reviewed.add(watchlist_id)
+                review = Review(review_user=user, **data)
+                review.platform_id = platforms[watchlist_id]
+                reviews.append(review)
+                kept.append((index, data))
+                continue
+            errors.append({"index": index, "errors": {"watchlist": [message]}})
+        valid[:] = kept
+        return reviews
+
+    def update_ratings(self, reviews):
+        by_watchlist = {}
+        for review in reviews:
+            by_watchlist.setdefault(review.watchlist_id, []).append(review)
+        for watchlist_id, created in by_watchlist.items():
+            ratings.reviews_created(watchlist_id, created)
+
+
+class ReviewList(StreamingListMixin, generics.ListAPIView):
     # queryset = Review.objects.all()
     # permission_classes = [IsAuthenticated]
-    serializer_class = ReviewSerializer
+    serializer_class = ReviewValuesSerializer
 
     throttle_classes = [ReviewListThrottle, AnonRateThrottle]
     filter_backends = [DjangoFilterBackend]
@@ -84,16 +239,72 @@ class ReviewList(generics.ListAPIView):
 
     def get_queryset(self):
         pk = self.kwargs["pk"]
-        return Review.objects.filter(watchlist_id=pk)
+        return ReviewValuesSerializer.values(Review.objects.filter(watchlist_id=pk))
+
+    validator_models = (Review,)
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
 class ReviewDetail(generics.RetrieveUpdateDestroyAPIView):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [IsReviewUserOrReadOnly]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [TokenBucketScopedRateThrottle]
     throttle_scope = "review-detail"
 
+    # Retried from the parsed request data, refetching the review.
+    @retry_on_lock
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @retry_on_lock
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+    def locked_row(self, instance):
+        """
+        Re-read the rating of `instance` inside the transaction: the deltas
+        must undo the row being replaced, not the one loaded before it,
+        which a concurrent request may have changed or deleted since.
+        SQLite has no row locks, but a write on a snapshot that another
+        connection has changed since fails, and `retry_on_lock` runs the
+        request again.
+        """
+        return (
+            Review.objects.select_for_update()
+            .filter(pk=instance.pk)
+            .values("rating", "active")
+            .first()
+        )
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old = self.locked_row(serializer.instance)
+            if old is None:
+                # save() would insert it again.
+                raise NotFound()
+            review = serializer.save()
+            ratings.review_updated(
+                review.watchlist_id,
+                old["rating"],
+                review.rating,
+                old["active"],
+                review.active,
+            )
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            old = self.locked_row(instance)
+            deleted, _ = instance.delete()
+            # Only the request that removed the row updates the aggregates.
+            if old is not None and deleted:
+                ratings.review_deleted(
+                    instance.watchlist_id, old["rating"], old["active"]
+                )
+
 
 # ------------------------------------------------- Generic Class based views with mixins --------------------------------
 
@@ -122,11 +333,55 @@ class ReviewDetail(generics.RetrieveUpdateDestroyAPIView):
 
 
 # class StreamPlatformMVS(viewsets.ReadOnlyModelViewSet):
-class StreamPlatformMVS(viewsets.ModelViewSet):
+class StreamPlatformMVS(StreamingListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAdminOrReadOnly]
 
-    queryset = StreamPlatform.objects.all()
+    queryset = StreamPlatform.objects.prefetch_related("watchlist")
     serializer_class = StreamPlatformSerializer
+    top_limit = 10
+    max_top_limit = 100
+
+    # Titles embed their ratings, which reviews update.
+    validator_models = (StreamPlatform, WatchList, Review)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "top":
+            # `top` reads its titles from the leaderboard index itself.
+            queryset = queryset.prefetch_related(None)
+        return queryset
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = cache.get_or_set(
+            cache.platform_key(kwargs[self.lookup_field]),
+            lambda: self.get_serializer(self.get_object()).data,
+        )
+        return Response(data)
+
+    @action(detail=True)
+    def top(self, request, pk=None):
+        """
+        The platform's active titles with the best `weighted_rating`, read
+        in order from the leaderboard index. `?limit=` caps the count.
+        """
+        try:
+            limit = int(request.query_params.get("limit", self.top_limit))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValidationError({"limit": ["A positive integer is required."]})
+
+        platform = self.get_object()
+        # Unreviewed titles score 0 and are left out.
+        titles = WatchList.objects.filter(
+            platform_id=platform.id, active=True, weighted_rating__gt=0
+        ).order_by("-weighted_rating", "id")[: min(limit, self.max_top_limit)]
+        rows = WatchListValuesSerializer.values(titles)
+        return Response(WatchListValuesSerializer(rows, many=True).data)
 
 
 # ------------------------------------------------- Class based views ViewsSets --------------------------------
@@ -159,7 +414,7 @@ class StreamPlatformAV(APIView):
     permission_classes = [IsAdminOrReadOnly]
 
     def get(self, request):
-        platform = StreamPlatform.objects.all()
+        platform = StreamPlatform.objects.prefetch_related("watchlist")
         serializer = StreamPlatformSerializer(
             platform, many=True, context={"request": request}
         )
@@ -179,17 +434,26 @@ class StreamPlatformDetailAV(APIView):
 
     def get_object(self, pk):
         try:
-            return StreamPlatform.objects.get(id=pk)
+            return StreamPlatform.objects.prefetch_related("watchlist").get(id=pk)
         except StreamPlatform.DoesNotExist:
             return None
 
     def get(self, request, pk):
+        data = cache.get_or_set(
+            cache.platform_key(pk), lambda: self.serialize(request, pk)
+        )
+        if data is None:
+            return Response({"message": "Stream not found"}, status.HTTP_404_NOT_FOUND)
+
+        return Response(data)
+
+    def serialize(self, request, pk):
         stream = self.get_object(pk)
         if stream is None:
-            return Response({"message": "Stream not found"}, status.HTTP_404_NOT_FOUND)
+            return None
 
         serializer = StreamPlatformSerializer(stream, context={"request": request})
-        return Response(serializer.data)
+        return serializer.data
 
     def put(self, request, pk):
         stream = self.get_object(pk)
@@ -214,9 +478,9 @@ class StreamPlatformDetailAV(APIView):
 
 
 class WatchListSearch(generics.ListAPIView):
-    queryset = WatchList.objects.all()
-    serializer_class = WatchListSerializer
-    filter_backends = [filters.SearchFilter]
+    queryset = WatchListValuesSerializer.values(WatchList.objects.all())
+    serializer_class = WatchListValuesSerializer
+    filter_backends = [FullTextSearchFilter]
     search_fields = ["title", "platform__name"]
     pagination_class = WatchListCursorPagination
 
@@ -224,10 +488,21 @@ class WatchListSearch(generics.ListAPIView):
 class WatchListAP(APIView):
     permission_classes = [IsAdminOrReadOnly]
 
+    # Every title embeds its platform name and its ratings.
+    validator_models = (WatchList, StreamPlatform, Review)
+
+    @conditional_get
     def get(self, request):
-        movies = WatchList.objects.all()
-        serializer = WatchListSerializer(movies, many=True)
-        return Response(serializer.data)
+        movies = WatchListValuesSerializer.values(WatchList.objects.all())
+        if stream_requested(request):
+            return streaming_response(
+                movies.order_by("created", "id"), WatchListValuesSerializer
+            )
+
+        paginator = WatchListCursorPagination()
+        page = paginator.paginate_queryset(movies, request, view=self)
+        serializer = WatchListValuesSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         serializer = WatchListSerializer(data=request.data)
@@ -235,7 +510,7 @@ class WatchListAP(APIView):
             serializer.save()
             return Response(serializer.data)
         else:
-            return Response(serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class WatchListDetailAP(APIView):
@@ -243,19 +518,26 @@ class WatchListDetailAP(APIView):
 
     def get_object(self, pk):
         try:
-            return WatchList.objects.get(id=pk)
+            return WatchList.objects.select_related("platform").get(id=pk)
         except WatchList.DoesNotExist:
             return None
 
     def get(self, request, pk):
-        movie = self.get_object(pk)
-        if movie is None:
+        data = cache.get_or_set(cache.watchlist_key(pk), lambda: self.serialize(pk))
+        if data is None:
             return Response(
                 {"message": "Movie not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+        return Response(data)
+
+    def serialize(self, pk):
+        movie = self.get_object(pk)
+        if movie is None:
+            return None
+
         serializer = WatchListSerializer(movie)
-        return Response(serializer.data)
+        return serializer.data
 
     def put(self, request, pk):
         movie = self.get_object(pk)
@@ -281,6 +563,23 @@ class WatchListDetailAP(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class CacheStatsAV(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache.stats.as_dict())
+
+
+class MetricsAV(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render_prometheus(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
 # ------------------------------------------------- function based views --------------------------------
 
 # @api_view(["GET", "POST"])
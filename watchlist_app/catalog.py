@@ -0,0 +1,39 @@
+"""
+Row formats shared by the import_catalog and export_catalog commands. The
+files themselves are read and written by `watchmate.rows`.
+
+Each kind of record is a flat row. Titles refer to their platform by name,
+and reviews to their title by title and platform name and to their author
+by username, so a dump stays readable and can be loaded into a database
+with different ids. Where names repeat, the oldest row wins.
+"""
+
+# Column order of an export, per kind.
+FIELDS = {
+    "platforms": ["id", "name", "about", "website"],
+    "watchlists": ["id", "title", "storyline", "platform", "active", "created"],
+    "reviews": [
+        "id",
+        "watchlist",
+        "platform",
+        "review_user",
+        "rating",
+        "description",
+        "active",
+        "created",
+    ],
+}
+
+# The model lookup behind each exported column that is not a plain field,
+# per kind.
+LOOKUPS = {
+    "platforms": {},
+    "watchlists": {"platform": "platform__name"},
+    "reviews": {
+        "watchlist": "watchlist__title",
+        "platform": "watchlist__platform__name",
+        "review_user": "review_user__username",
+    },
+}
+
+KINDS = tuple(FIELDS)
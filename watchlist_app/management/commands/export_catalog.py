@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from watchlist_app import catalog
+from watchlist_app.models import StreamPlatform, WatchList, Review
+from watchmate import rows as row_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream platforms, titles or reviews to a JSONL or CSV file in "
+        "constant memory."
+    )
+
+    querysets = {
+        "platforms": StreamPlatform.objects.all,
+        "watchlists": WatchList.objects.all,
+        "reviews": Review.objects.all,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=catalog.KINDS)
+        parser.add_argument(
+            "--output", default="-", help="File to write, or - for stdout."
+        )
+        parser.add_argument(
+            "--format",
+            choices=row_files.FORMATS,
+            help="Defaults to the output file extension, else jsonl.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, kind, **options):
+        path = options["output"]
+        fields = catalog.FIELDS[kind]
+        lookups = catalog.LOOKUPS[kind]
+        rows = (
+            self.querysets[kind]()
+            .order_by("id")
+            .values_list(*(lookups.get(field, field) for field in fields))
+            # Stream from one cursor instead of loading the table.
+            .iterator(chunk_size=options["chunk_size"])
+        )
+
+        start = time.perf_counter()
+        stream = self.stdout if path == "-" else open(path, "w", newline="")
+        try:
+            writer = row_files.RowWriter(
+                stream, row_files.guess_format(path, options["format"]), fields
+            )
+            count = 0
+            for count, values in enumerate(rows, 1):
+                writer.write(values)
+        finally:
+            if stream is not self.stdout:
+                stream.close()
+
+        elapsed = time.perf_counter() - start
+        # Keep stdout clean when it carries the dump itself.
+        out = self.stderr if path == "-" else self.stdout
+        out.write(
+            self.style.SUCCESS(
+                f"Exported {count} {kind} in {elapsed:.1f}s "
+                f"({count / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,256 @@
+import csv
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from watchlist_app import catalog, ratings
+from watchlist_app.api import cache, response_cache
+from watchlist_app.models import StreamPlatform, WatchList, Review
+from watchmate import rows as row_files
+
+
+def as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Load platforms, titles or reviews from a JSONL or CSV file in "
+        "fixed-size batches. Titles name their platform and reviews name "
+        "their title, its platform and their author; rows that do not "
+        "resolve or validate are skipped."
+    )
+
+    models = {
+        "platforms": StreamPlatform,
+        "watchlists": WatchList,
+        "reviews": Review,
+    }
+
+    # Rows reported individually before only the count is kept.
+    max_reported = 20
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=catalog.KINDS)
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=row_files.FORMATS,
+            help="Defaults to the file extension, else jsonl.",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--keep-ids",
+            action="store_true",
+            help=(
+                "Insert rows with their exported id, skipping ids that "
+                "already exist. Run sqlsequencereset afterwards on PostgreSQL."
+            ),
+        )
+
+    def handle(self, kind, path, **options):
+        self.keep_ids = options["keep_ids"]
+        self.skipped = 0
+        self.batch_size = options["batch_size"]
+        # Titles whose reviews changed, see update_ratings().
+        self.touched = set()
+        build = getattr(self, f"build_{kind}")
+        if kind == "watchlists":
+            # Platforms are few: resolve every name from one query. Where
+            # names repeat, the oldest platform wins.
+            self.platforms = dict(
+                StreamPlatform.objects.order_by("-id").values_list("name", "id")
+            )
+
+        start = time.perf_counter()
+        imported = 0
+        stream = sys.stdin if path == "-" else open(path, newline="")
+        try:
+            rows = row_files.read_rows(
+                stream, row_files.guess_format(path, options["format"])
+            )
+            while batch := list(islice(rows, self.batch_size)):
+                objs = build(batch)
+                if objs:
+                    with transaction.atomic():
+                        self.models[kind].objects.bulk_create(objs)
+                    self.after_insert(kind, objs)
+                imported += len(objs)
+        except (ValueError, csv.Error) as exc:
+            # Malformed JSON or CSV: earlier batches are already committed.
+            raise CommandError(f"{path}: {exc} (after {imported} rows)")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            self.update_ratings()
+
+        if cache.is_process_local():
+            self.stderr.write(self.style.WARNING(cache.PROCESS_LOCAL_WARNING))
+        elapsed = time.perf_counter() - start
+        rate = (imported + self.skipped) / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} {kind}, skipped {self.skipped}, in "
+                f"{elapsed:.1f}s ({rate:.0f} rows/s)"
+            )
+        )
+
+    def skip(self, line, message):
+        self.skipped += 1
+        if self.skipped <= self.max_reported:
+            self.stderr.write(f"line {line}: {message}")
+
+    def existing_ids(self, model, batch):
+        if not self.keep_ids:
+            return set()
+        ids = {as_int(row.get("id")) for line, row in batch} - {None}
+        return set(model.objects.filter(id__in=ids).values_list("id", flat=True))
+
+    def make(self, model, line, row, fields, existing, **values):
+        """
+        Build an unsaved `model` from `row`, or return None after reporting
+        why the row was skipped.
+        """
+        values.update(
+            (field, row[field]) for field in fields if row.get(field) is not None
+        )
+        if self.keep_ids:
+            values["id"] = as_int(row.get("id"))
+            if values["id"] is None:
+                return self.skip(line, f"invalid id {row.get('id')!r}")
+            if values["id"] in existing:
+                return self.skip(line, f"id {values['id']} already exists")
+            existing.add(values["id"])
+        obj = model(**values)
+        # Foreign keys are resolved by the caller. As in the API, nullable
+        # fields may be left out.
+        exclude = ["platform", "watchlist", "review_user"]
+        exclude += (
+            f.name for f in model._meta.fields if f.null and f.name not in values
+        )
+        try:
+            # Also converts CSV strings to the field types.
+            obj.clean_fields(exclude=exclude)
+        except ValidationError as exc:
+            return self.skip(line, "; ".join(exc.messages))
+        return obj
+
+    def build_platforms(self, batch):
+        existing = self.existing_ids(StreamPlatform, batch)
+        objs = (
+            self.make(StreamPlatform, line, row, ["name", "about", "website"], existing)
+            for line, row in batch
+        )
+        return [obj for obj in objs if obj is not None]
+
+    def build_watchlists(self, batch):
+        existing = self.existing_ids(WatchList, batch)
+        objs = []
+        for line, row in batch:
+            platform_id = self.platforms.get(row.get("platform"))
+            if platform_id is None:
+                self.skip(line, f"unknown platform {row.get('platform')!r}")
+                continue
+            obj = self.make(
+                WatchList,
+                line,
+                row,
+                ["title", "storyline", "active"],
+                existing,
+                platform_id=platform_id,
+            )
+            if obj is not None:
+                objs.append(obj)
+        return objs
+
+    def build_reviews(self, batch):
+        existing = self.existing_ids(Review, batch)
+        # (platform name, title) -> id, the oldest title winning.
+        watchlists = dict(
+            ((platform, title), id)
+            for platform, title, id in WatchList.objects.filter(
+                title__in={row.get("watchlist") for line, row in batch} - {None},
+                platform__name__in={row.get("platform") for line, row in batch}
+                - {None},
+            )
+            .order_by("-id")
+            .values_list("platform__name", "title", "id")
+        )
+        users = dict(
+            User.objects.filter(
+                username__in={row.get("review_user") for line, row in batch} - {None}
+            ).values_list("username", "id")
+        )
+        # One review per user per title, in the database and in this batch.
+        reviewed = set(
+            Review.objects.filter(
+                watchlist_id__in=watchlists.values(),
+                review_user_id__in=users.values(),
+            ).values_list("watchlist_id", "review_user_id")
+        )
+
+        objs = []
+        for line, row in batch:
+            watchlist_id = watchlists.get((row.get("platform"), row.get("watchlist")))
+            user_id = users.get(row.get("review_user"))
+            if watchlist_id is None:
+                self.skip(
+                    line,
+                    f"unknown watchlist {row.get('watchlist')!r} "
+                    f"on {row.get('platform')!r}",
+                )
+            elif user_id is None:
+                self.skip(line, f"unknown user {row.get('review_user')!r}")
+            elif (watchlist_id, user_id) in reviewed:
+                self.skip(line, "user already reviewed this title")
+            else:
+                obj = self.make(
+                    Review,
+                    line,
+                    row,
+                    ["rating", "description", "active"],
+                    existing,
+                    watchlist_id=watchlist_id,
+                    review_user_id=user_id,
+                )
+                if obj is not None:
+                    reviewed.add((watchlist_id, user_id))
+                    objs.append(obj)
+        return objs
+
+    def after_insert(self, kind, objs):
+        # bulk_create() sends no signals: do the work of signals.py here,
+        # once the batch has committed.
+        response_cache.bump(self.models[kind])
+        if kind == "watchlists":
+            cache.invalidate_platforms(*{obj.platform_id for obj in objs})
+        elif kind == "reviews":
+            self.touched.update(obj.watchlist_id for obj in objs)
+
+    def update_ratings(self):
+        """
+        Recompute the aggregates of every title that gained reviews.
+
+        Popular titles appear in most batches, so this runs once at the end
+        rather than per batch, in chunks that keep the IN lists short.
+        """
+        touched = sorted(self.touched)
+        for i in range(0, len(touched), self.batch_size):
+            watchlists = WatchList.objects.filter(
+                id__in=touched[i : i + self.batch_size]
+            )
+            ratings.recompute(watchlists)
+            cache.invalidate_watchlists(*touched[i : i + self.batch_size])
+            cache.invalidate_platforms(
+                *watchlists.values_list("platform_id", flat=True).distinct()
+            )
+        if touched:
+            response_cache.bump(WatchList)
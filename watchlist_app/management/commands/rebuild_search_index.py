@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from watchlist_app import search
+from watchlist_app.api import response_cache
+from watchlist_app.models import WatchList
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for WatchList."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if not search.is_supported(using):
+            raise CommandError("Full-text search requires SQLite.")
+
+        search.install(using)
+        indexed = search.rebuild(using)
+        response_cache.bump(WatchList)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} titles"))
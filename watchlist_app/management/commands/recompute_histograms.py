@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from watchlist_app import ratings
+from watchlist_app.api import cache, response_cache
+from watchlist_app.models import WatchList
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-title star histograms from reviews in one pass."
+
+    def handle(self, *args, **options):
+        updated = ratings.recompute_histograms()
+        # Every title, and every platform that embeds them.
+        cache.invalidate_catalog()
+        response_cache.bump(WatchList)
+        if cache.is_process_local():
+            self.stderr.write(self.style.WARNING(cache.PROCESS_LOCAL_WARNING))
+        self.stdout.write(
+            self.style.SUCCESS(f"Recomputed rating histograms for {updated} titles")
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from watchlist_app import ratings
+from watchlist_app.api import cache, response_cache
+from watchlist_app.models import WatchList
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute avg_rating, number_rating, total_rating and weighted_rating "
+        "from reviews."
+    )
+
+    def handle(self, *args, **options):
+        updated = ratings.recompute()
+        # Every title, and every platform that embeds them.
+        cache.invalidate_catalog()
+        response_cache.bump(WatchList)
+        if cache.is_process_local():
+            self.stderr.write(self.style.WARNING(cache.PROCESS_LOCAL_WARNING))
+        self.stdout.write(
+            self.style.SUCCESS(f"Recomputed ratings for {updated} titles")
+        )
@@ -0,0 +1,144 @@
+import random
+import time
+from bisect import bisect
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from watchlist_app import ratings
+from watchlist_app.models import StreamPlatform, WatchList, Review
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk insert a synthetic catalog: platforms, titles, users with auth "
+        "tokens, and reviews whose popularity follows a Zipf-like skew."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platforms", type=int, default=20)
+        parser.add_argument("--titles", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--reviews", type=int, default=20000)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent for title popularity; 0 spreads reviews evenly.",
+        )
+        parser.add_argument("--password", default="password")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.random = random.Random(options["seed"])
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            platform_ids = self.create_platforms(options["platforms"])
+            title_ids = self.create_titles(options["titles"], platform_ids)
+            user_ids = self.create_users(options["users"], options["password"])
+            reviews = self.create_reviews(
+                options["reviews"], title_ids, user_ids, options["skew"]
+            )
+            # bulk_create() bypasses the per-review aggregate updates.
+            ratings.recompute(WatchList.objects.filter(id__in=set(title_ids)))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(platform_ids)} platforms, {len(title_ids)} titles, "
+                f"{len(user_ids)} users and {reviews} reviews in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+        )
+
+    def bulk_ids(self, model, objs):
+        objs = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        return [obj.pk for obj in objs]
+
+    def create_platforms(self, count):
+        offset = StreamPlatform.objects.count()
+        return self.bulk_ids(
+            StreamPlatform,
+            (
+                StreamPlatform(
+                    name=f"platform {offset + i}",
+                    about="Synthetic platform",
+                    website=f"https://platform{offset + i}.example.com",
+                )
+                for i in range(count)
+            ),
+        )
+
+    def create_titles(self, count, platform_ids):
+        offset = WatchList.objects.count()
+        return self.bulk_ids(
+            WatchList,
+            (
+                WatchList(
+                    platform_id=self.random.choice(platform_ids),
+                    title=f"title {offset + i}",
+                    storyline="Synthetic storyline",
+                )
+                for i in range(count)
+            ),
+        )
+
+    def create_users(self, count, password):
+        # Hash once; every synthetic user shares the same password.
+        password = make_password(password)
+        offset = User.objects.count()
+        user_ids = self.bulk_ids(
+            User,
+            (
+                User(username=f"user{offset + i}", password=password)
+                for i in range(count)
+            ),
+        )
+        # bulk_create() skips the post_save signal that creates tokens.
+        Token.objects.bulk_create(
+            (Token(user_id=pk, key=Token.generate_key()) for pk in user_ids),
+            batch_size=self.batch_size,
+        )
+        return user_ids
+
+    def create_reviews(self, count, title_ids, user_ids, skew):
+        if not title_ids or not user_ids:
+            return 0
+
+        per_user, remainder = divmod(count, len(user_ids))
+        cum_weights = list(
+            accumulate(1 / (rank**skew) for rank in range(1, len(title_ids) + 1))
+        )
+
+        def reviews():
+            for i, user_id in enumerate(user_ids):
+                wanted = min(per_user + (i < remainder), len(title_ids))
+                for title_index in self.pick_titles(wanted, cum_weights):
+                    yield Review(
+                        review_user_id=user_id,
+                        watchlist_id=title_ids[title_index],
+                        rating=self.random.randint(1, 5),
+                        description="Synthetic review",
+                    )
+
+        return len(Review.objects.bulk_create(reviews(), batch_size=self.batch_size))
+
+    def pick_titles(self, wanted, cum_weights):
+        """
+        Pick `wanted` distinct title indexes, weighted by popularity.
+        """
+        if wanted * 2 > len(cum_weights):
+            # Rejection sampling stalls near exhaustion; skew matters less here.
+            return self.random.sample(range(len(cum_weights)), wanted)
+
+        picked = set()
+        total = cum_weights[-1]
+        while len(picked) < wanted:
+            picked.add(bisect(cum_weights, self.random.random() * total))
+        return picked
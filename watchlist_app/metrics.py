@@ -0,0 +1,271 @@
+"""
+Per-request timings and per-route latency histograms.
+
+`TimingMiddleware` measures every request: wall time, query count and
+database time, serializer time and response rendering time. Serializers
+report their time through `TimedSerializerMixin`, or `timed("serialize")`
+around whatever else builds a response body. It reports
+them in a `Server-Timing` header and folds them into in-process
+aggregates that `render_prometheus()` exposes.
+
+Aggregates live in the worker process, so each worker reports its own;
+scrape every worker or sum them upstream.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+
+# Upper bounds in seconds, as in the Prometheus client defaults.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar("request_timings", default=None)
+
+
+class Timings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        # Nested timed() sections are counted once, by the outermost one.
+        self.depth = 0
+
+    def header(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+                f"serialize;dur={self.serialize * 1000:.2f}",
+                f"render;dur={self.render * 1000:.2f}",
+                f"total;dur={self.total * 1000:.2f}",
+            ]
+        )
+
+
+@contextmanager
+def timed(section):
+    """
+    Add the time spent in the block to `section` of the current request.
+    """
+    timings = _current.get()
+    if timings is None or timings.depth:
+        yield
+        return
+
+    timings.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.depth -= 1
+        setattr(
+            timings, section, getattr(timings, section) + time.perf_counter() - start
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.queries += 1
+
+
+def install_query_timing(connection, **kwargs):
+    # Connections are per thread, and under ASGI queries run in worker
+    # threads, so the wrapper is attached to every connection once and
+    # finds the request through a context variable. It goes first so that
+    # the execute_wrapper() context manager still pops its own wrapper.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class RouteStats:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def observe(self, route, method, timings):
+        with self.lock:
+            stats = self.routes.get((route, method))
+            if stats is None:
+                stats = self.routes[(route, method)] = RouteStats()
+            for i, bound in enumerate(BUCKETS):
+                if timings.total <= bound:
+                    stats.buckets[i] += 1
+                    break
+            stats.count += 1
+            stats.total += timings.total
+            stats.queries += timings.queries
+            stats.db += timings.db
+            stats.serialize += timings.serialize
+            stats.render += timings.render
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                key: (list(stats.buckets), vars(stats).copy())
+                for key, stats in self.routes.items()
+            }
+
+
+registry = Registry()
+
+
+def _labels(route, method):
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'route="{route}",method="{method}"'
+
+
+def render_prometheus(snapshot=None):
+    """
+    Return the aggregates in the Prometheus text exposition format.
+    """
+    if snapshot is None:
+        snapshot = registry.snapshot()
+
+    lines = [
+        "# HELP watchmate_request_duration_seconds Request wall time.",
+        "# TYPE watchmate_request_duration_seconds histogram",
+    ]
+    for (route, method), (buckets, stats) in sorted(snapshot.items()):
+        labels = _labels(route, method)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, buckets):
+            cumulative += count
+            lines.append(
+                f'watchmate_request_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                f"{cumulative}"
+            )
+        lines.append(
+            f'watchmate_request_duration_seconds_bucket{{{labels},le="+Inf"}} '
+            f"{stats['count']}"
+        )
+        lines.append(
+            f"watchmate_request_duration_seconds_sum{{{labels}}} {stats['total']}"
+        )
+        lines.append(
+            f"watchmate_request_duration_seconds_count{{{labels}}} {stats['count']}"
+        )
+
+    for name, key, help in [
+        ("db_queries_total", "queries", "Database queries issued."),
+        ("db_seconds_total", "db", "Time spent in database queries."),
+        ("serialize_seconds_total", "serialize", "Time spent in serializers."),
+        ("render_seconds_total", "render", "Time spent rendering responses."),
+    ]:
+        lines.append(f"# HELP watchmate_{name} {help}")
+        lines.append(f"# TYPE watchmate_{name} counter")
+        for (route, method), (buckets, stats) in sorted(snapshot.items()):
+            lines.append(f"watchmate_{name}{{{_labels(route, method)}}} {stats[key]}")
+    return "\n".join(lines) + "\n"
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Count `.data` as serializer time of the current request. For
+    `many=True`, set `list_serializer_class = TimedListSerializer` in Meta.
+    Nested serializers do not go through `.data`, so only the outermost
+    serializer of a response is counted.
+    """
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class TimingMiddleware:
+    """
+    Measure each request, add a `Server-Timing` header and record the
+    request in `registry`. Place it first in MIDDLEWARE so that the total
+    covers the other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        connection_created.connect(install_query_timing)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # Connections opened before the middleware was loaded.
+        for connection in connections.all(initialized_only=True):
+            install_query_timing(connection)
+
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    def process_template_response(self, request, response):
+        # Called right before Django renders a DRF Response.
+        def timed_render():
+            del response.render
+            with timed("render"):
+                return response.render()
+
+        response.render = timed_render
+        return response
+
+    def finish(self, request, response, timings):
+        timings.total = time.perf_counter() - timings.start
+        response.headers["Server-Timing"] = timings.header()
+
+        match = request.resolver_match
+        route = match.route if match is not None else "unmatched"
+        registry.observe(route, request.method, timings)
+        return response
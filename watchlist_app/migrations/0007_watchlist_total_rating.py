@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:28
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    WatchList = apps.get_model("watchlist_app", "WatchList")
+    Review = apps.get_model("watchlist_app", "Review")
+
+    reviews = Review.objects.filter(watchlist=OuterRef("pk")).values("watchlist")
+    WatchList.objects.update(
+        number_rating=Coalesce(
+            Subquery(reviews.annotate(count=Count("id")).values("count")), 0
+        ),
+        total_rating=Coalesce(
+            Subquery(reviews.annotate(total=Sum("rating")).values("total")), 0
+        ),
+        avg_rating=Coalesce(
+            Subquery(
+                reviews.annotate(avg=Avg("rating", output_field=FloatField())).values(
+                    "avg"
+                )
+            ),
+            0.0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchlist_app", "0006_watchlist_avg_rating_watchlist_number_rating"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="watchlist",
+            name="total_rating",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
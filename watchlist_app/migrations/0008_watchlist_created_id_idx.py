@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchlist_app", "0007_watchlist_total_rating"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="watchlist",
+            index=models.Index(
+                fields=["created", "id"], name="watchlist_created_id_idx"
+            ),
+        ),
+    ]
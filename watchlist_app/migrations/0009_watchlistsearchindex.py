@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import watchlist_app.search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchlist_app", "0008_watchlist_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WatchListSearchIndex",
+            fields=[
+                (
+                    "watchlist",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_index",
+                        serialize=False,
+                        to="watchlist_app.watchlist",
+                    ),
+                ),
+                ("title", models.TextField()),
+                ("platform", models.TextField()),
+                (
+                    "document",
+                    watchlist_app.search.DocumentField(
+                        db_column="watchlist_app_watchlist_fts"
+                    ),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "watchlist_app_watchlist_fts",
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:43
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max, Sum
+import django.db.models.deletion
+
+
+def delete_duplicate_reviews(apps, schema_editor):
+    """
+    Keep the newest review of each (watchlist, review_user) pair so that
+    unique_review_per_user can be added, and recount the affected titles.
+    """
+    Review = apps.get_model("watchlist_app", "Review")
+    WatchList = apps.get_model("watchlist_app", "WatchList")
+    reviews = Review.objects.using(schema_editor.connection.alias)
+
+    duplicates = list(
+        reviews.values("watchlist_id", "review_user_id")
+        .annotate(count=Count("id"), keep=Max("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates:
+        reviews.filter(
+            watchlist_id=duplicate["watchlist_id"],
+            review_user_id=duplicate["review_user_id"],
+            id__lt=duplicate["keep"],
+        ).delete()
+
+    for watchlist_id in {duplicate["watchlist_id"] for duplicate in duplicates}:
+        totals = reviews.filter(watchlist_id=watchlist_id).aggregate(
+            number=Count("id"), total=Sum("rating"), avg=Avg("rating")
+        )
+        WatchList.objects.using(schema_editor.connection.alias).filter(
+            id=watchlist_id
+        ).update(
+            number_rating=totals["number"],
+            total_rating=totals["total"] or 0,
+            avg_rating=totals["avg"] or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("watchlist_app", "0009_watchlistsearchindex"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="review",
+            name="review_user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="review",
+            name="watchlist",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reviews",
+                to="watchlist_app.watchlist",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["watchlist", "active", "review_user"],
+                name="review_watchlist_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["review_user", "created"], name="review_user_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="review",
+            constraint=models.UniqueConstraint(
+                fields=("watchlist", "review_user"), name="unique_review_per_user"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchlist_app", "0011_throttlebucket"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="streamplatform",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="watchlist",
+            index=models.Index(fields=["updated"], name="watchlist_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:48
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+
+def backfill_weighted_rating(apps, schema_editor):
+    WatchList = apps.get_model("watchlist_app", "WatchList")
+
+    # As watchlist_app.ratings.weighted() at the time of writing.
+    min_votes = getattr(settings, "WATCHLIST_LEADERBOARD_MIN_VOTES", 5)
+    prior = getattr(settings, "WATCHLIST_LEADERBOARD_PRIOR", 3.0)
+    WatchList.objects.filter(number_rating__gt=0).update(
+        weighted_rating=(Cast(F("total_rating"), FloatField()) + min_votes * prior)
+        / (Cast(F("number_rating"), FloatField()) + min_votes)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchlist_app", "0012_streamplatform_updated_watchlist_updated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="watchlist",
+            name="weighted_rating",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="watchlist",
+            index=models.Index(
+                condition=models.Q(("active", True)),
+                fields=["platform", "-weighted_rating", "id"],
+                name="watchlist_leaderboard_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_weighted_rating, migrations.RunPython.noop),
+    ]
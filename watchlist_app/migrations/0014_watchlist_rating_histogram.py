@@ -0,0 +1,91 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:51
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_histograms(apps, schema_editor):
+    WatchList = apps.get_model("watchlist_app", "WatchList")
+    Review = apps.get_model("watchlist_app", "Review")
+
+    # One GROUP BY over reviews, as watchlist_app.ratings.recompute_histograms().
+    counts = {}
+    for stars in range(1, 6):
+        counts[f"stars_{stars}"] = Count("id", filter=Q(rating=stars))
+        counts[f"active_stars_{stars}"] = Count(
+            "id", filter=Q(rating=stars, active=True)
+        )
+    rows = Review.objects.order_by().values("watchlist_id").annotate(**counts)
+
+    quote_name = schema_editor.connection.ops.quote_name
+    assignments = ", ".join(f"{quote_name(column)} = %s" for column in counts)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {quote_name(WatchList._meta.db_table)} SET {assignments} "
+            "WHERE id = %s",
+            [
+                [row[column] for column in counts] + [row["watchlist_id"]]
+                for row in rows
+            ],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchlist_app", "0013_watchlist_weighted_rating"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="watchlist",
+            name="active_stars_1",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="active_stars_2",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="active_stars_3",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="active_stars_4",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="active_stars_5",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="stars_1",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="stars_2",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="stars_3",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="stars_4",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="watchlist",
+            name="stars_5",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_histograms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchlist_app", "0014_watchlist_rating_histogram"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="review",
+            name="review_user_idx",
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["review_user", "created", "id"], name="review_user_feed_idx"
+            ),
+        ),
+    ]
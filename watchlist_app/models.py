@@ -2,12 +2,15 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
 
+from .search import FTS_TABLE, DocumentField
+
 
 # Create your models here.
 class StreamPlatform(models.Model):
     name = models.CharField(max_length=50)
     about = models.CharField(max_length=150)
     website = models.URLField(max_length=200)
+    updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -22,24 +25,105 @@ class WatchList(models.Model):
     active = models.BooleanField(default=True)
     avg_rating = models.FloatField(default=0)
     number_rating = models.IntegerField(default=0)
+    total_rating = models.IntegerField(default=0)
+    # Bayesian average maintained by watchlist_app.ratings.
+    weighted_rating = models.FloatField(default=0)
+    # Reviews per star, all and active only, maintained by
+    # watchlist_app.ratings.
+    stars_1 = models.IntegerField(default=0)
+    stars_2 = models.IntegerField(default=0)
+    stars_3 = models.IntegerField(default=0)
+    stars_4 = models.IntegerField(default=0)
+    stars_5 = models.IntegerField(default=0)
+    active_stars_1 = models.IntegerField(default=0)
+    active_stars_2 = models.IntegerField(default=0)
+    active_stars_3 = models.IntegerField(default=0)
+    active_stars_4 = models.IntegerField(default=0)
+    active_stars_5 = models.IntegerField(default=0)
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created", "id"], name="watchlist_created_id_idx"),
+            # MAX(updated) for the conditional GETs in api.conditional.
+            models.Index(fields=["updated"], name="watchlist_updated_idx"),
+            # Top active titles of a platform, best first. Partial, because
+            # Django filters active=True as a bare column that SQLite can
+            # match against the index condition but not seek on.
+            models.Index(
+                fields=["platform", "-weighted_rating", "id"],
+                condition=models.Q(active=True),
+                name="watchlist_leaderboard_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class WatchListSearchIndex(models.Model):
+    # Maintained by triggers, see watchlist_app.search.
+    watchlist = models.OneToOneField(
+        WatchList,
+        primary_key=True,
+        db_column="rowid",
+        on_delete=models.DO_NOTHING,
+        related_name="search_index",
+    )
+    title = models.TextField()
+    platform = models.TextField()
+    document = DocumentField(db_column=FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
+
 class Review(models.Model):
-    review_user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Both foreign keys are served by the composite indexes in Meta.
+    review_user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     rating = models.PositiveIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)]
     )
     description = models.CharField(max_length=200, null=True)
     watchlist = models.ForeignKey(
-        WatchList, on_delete=models.CASCADE, related_name="reviews"
+        WatchList, on_delete=models.CASCADE, related_name="reviews", db_index=False
     )
     active = models.BooleanField(default=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["watchlist", "review_user"], name="unique_review_per_user"
+            ),
+        ]
+        indexes = [
+            # ReviewList: watchlist_id plus the optional active/username filters.
+            models.Index(
+                fields=["watchlist", "active", "review_user"],
+                name="review_watchlist_active_idx",
+            ),
+            # UserReview: one user's reviews in feed order, so that each
+            # page is a single range scan. Not covering: the rows of the
+            # page are still read from the table. Also serves the queries
+            # of the (review_user, created) index it replaced.
+            models.Index(
+                fields=["review_user", "created", "id"], name="review_user_feed_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.rating} | {self.watchlist.title} | {str(self.review_user)}"
+
+
+class ThrottleBucket(models.Model):
+    # Theoretical arrival time of the next request, see api.throttling.
+    key = models.CharField(max_length=255, primary_key=True)
+    tat = models.FloatField()
+
+    def __str__(self):
+        return self.key
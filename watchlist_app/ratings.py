@@ -0,0 +1,225 @@
+"""
+Rating aggregates for `WatchList`.
+
+Each title keeps a running `total_rating` and `number_rating`; `avg_rating`
+is derived from them. All changes are applied with a single UPDATE built
+from `F()` expressions, so concurrent review writers never race on a
+read-modify-write cycle in Python. Like `save()`, every change bumps
+`updated`, which the conditional GETs in `api.conditional` rely on.
+
+`weighted_rating` ranks the per-platform leaderboard. It is a Bayesian
+average that counts `WATCHLIST_LEADERBOARD_MIN_VOTES` phantom votes of
+`WATCHLIST_LEADERBOARD_PRIOR`, so a title with a single 5-star review does
+not outrank one with hundreds of 4.8s. The prior is a setting rather than
+the catalog-wide mean so that a review only ever moves its own title's
+score. Titles without reviews score 0. Changing either setting requires
+`recompute_ratings`.
+
+The star histogram lives in `stars_1`..`stars_5`, with the counts of
+active reviews alongside in `active_stars_1`..`active_stars_5`; the same
+UPDATE moves them.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from .models import WatchList, Review
+
+STARS = range(1, 6)
+
+
+def star_column(stars, active=False):
+    return f"active_stars_{stars}" if active else f"stars_{stars}"
+
+
+HISTOGRAM_COLUMNS = [star_column(stars) for stars in STARS] + [
+    star_column(stars, active=True) for stars in STARS
+]
+
+
+def min_votes():
+    return getattr(settings, "WATCHLIST_LEADERBOARD_MIN_VOTES", 5)
+
+
+def prior():
+    return getattr(settings, "WATCHLIST_LEADERBOARD_PRIOR", 3.0)
+
+
+def weighted(number_rating, total_rating):
+    """
+    The `weighted_rating` of a title with these totals, as an expression.
+    """
+    return (Cast(total_rating, FloatField()) + min_votes() * prior()) / (
+        Cast(number_rating, FloatField()) + min_votes()
+    )
+
+
+def _stars(rating, active, delta):
+    columns = [star_column(rating)]
+    if active:
+        columns.append(star_column(rating, active=True))
+    return Counter(dict.fromkeys(columns, delta))
+
+
+def _apply(watchlist_id, count_delta, sum_delta, stars):
+    number_rating = F("number_rating") + count_delta
+    total_rating = F("total_rating") + sum_delta
+    # The CASEs see the pre-update row, hence the shifted comparison.
+    rated = {"number_rating__gt": -count_delta}
+    return WatchList.objects.filter(id=watchlist_id).update(
+        number_rating=number_rating,
+        total_rating=total_rating,
+        avg_rating=Case(
+            When(
+                **rated,
+                then=Cast(total_rating, FloatField())
+                / Cast(number_rating, FloatField()),
+            ),
+            default=0.0,
+            output_field=FloatField(),
+        ),
+        weighted_rating=Case(
+            When(**rated, then=weighted(number_rating, total_rating)),
+            default=0.0,
+            output_field=FloatField(),
+        ),
+        **{
+            column: F(column) + delta
+            for column, delta in sorted(stars.items())
+            if delta
+        },
+        updated=timezone.now(),
+    )
+
+
+def review_created(watchlist_id, rating, active=True):
+    return _apply(watchlist_id, 1, rating, _stars(rating, active, 1))
+
+
+def reviews_created(watchlist_id, reviews):
+    """
+    Fold a batch of new `reviews` of one title into its aggregates.
+    """
+    stars = Counter()
+    for review in reviews:
+        stars.update(_stars(review.rating, review.active, 1))
+    total = sum(review.rating for review in reviews)
+    return _apply(watchlist_id, len(reviews), total, stars)
+
+
+def review_updated(
+    watchlist_id, old_rating, new_rating, old_active=True, new_active=True
+):
+    if (old_rating, old_active) == (new_rating, new_active):
+        return 0
+    stars = _stars(old_rating, old_active, -1)
+    stars.update(_stars(new_rating, new_active, 1))
+    return _apply(watchlist_id, 0, new_rating - old_rating, stars)
+
+
+def review_deleted(watchlist_id, rating, active=True):
+    return _apply(watchlist_id, -1, -rating, _stars(rating, active, -1))
+
+
+def recompute(queryset=None):
+    """
+    Recompute the aggregates of every title in `queryset` (all titles by
+    default) from the `Review` table in one UPDATE statement, then their
+    histograms with `recompute_histograms()`.
+    """
+    if queryset is None:
+        queryset = WatchList.objects.all()
+
+    reviews = Review.objects.filter(watchlist=OuterRef("pk")).values("watchlist")
+    number_rating = Coalesce(
+        Subquery(reviews.annotate(count=Count("id")).values("count")), 0
+    )
+    total_rating = Coalesce(
+        Subquery(reviews.annotate(total=Sum("rating")).values("total")), 0
+    )
+    avg_rating = Coalesce(
+        Subquery(
+            reviews.annotate(avg=Avg("rating", output_field=FloatField())).values("avg")
+        ),
+        0.0,
+    )
+    # Every assignment reads the pre-update row, so none can build on another.
+    titles = queryset.update(
+        number_rating=number_rating,
+        total_rating=total_rating,
+        avg_rating=avg_rating,
+        weighted_rating=Case(
+            When(Exists(reviews), then=weighted(number_rating, total_rating)),
+            default=0.0,
+            output_field=FloatField(),
+        ),
+        updated=timezone.now(),
+    )
+    recompute_histograms(queryset)
+    return titles
+
+
+def recompute_histograms(queryset=None):
+    """
+    Recompute the star histograms of every title in `queryset` (all titles
+    by default) from a single GROUP BY over the `Review` table.
+    """
+    reviews = Review.objects.order_by()
+    if queryset is None:
+        queryset = WatchList.objects.all()
+    else:
+        reviews = reviews.filter(watchlist__in=queryset.values("pk"))
+
+    counts = reviews.values("watchlist_id").annotate(
+        **{star_column(stars): Count("id", filter=Q(rating=stars)) for stars in STARS},
+        **{
+            star_column(stars, active=True): Count(
+                "id", filter=Q(rating=stars, active=True)
+            )
+            for stars in STARS
+        },
+    )
+
+    # One prepared UPDATE per title: bulk_update()'s CASE per column costs
+    # SQLite hundreds of times more.
+    connection = connections[queryset.db]
+    quote_name = connection.ops.quote_name
+    assignments = ", ".join(
+        f"{quote_name(column)} = %s" for column in HISTOGRAM_COLUMNS
+    )
+    sql = (
+        f"UPDATE {quote_name(WatchList._meta.db_table)} SET {assignments} "
+        f"WHERE {quote_name(WatchList._meta.pk.column)} = %s"
+    )
+    with transaction.atomic(using=queryset.db):
+        # Titles without reviews get no row from the GROUP BY.
+        titles = queryset.update(
+            **dict.fromkeys(HISTOGRAM_COLUMNS, 0), updated=timezone.now()
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                sql,
+                [
+                    [row[column] for column in HISTOGRAM_COLUMNS]
+                    + [row["watchlist_id"]]
+                    for row in counts.using(queryset.db)
+                ],
+            )
+    return titles
@@ -0,0 +1,219 @@
+"""
+Read replicas for the watchlist and review endpoints.
+
+`ReplicaMiddleware` marks safe requests as replica reads. While one runs,
+`ReplicaRouter` sends reads of this app's models to one of the aliases in
+WATCHLIST_REPLICAS, picked once per request. Everything else uses the
+primary: writes, unsafe requests, management commands, signals, and the
+body of a streamed response, which is read after the middleware returns.
+
+Cached responses are filled from the primary, under `primary_reads()`,
+so that a lagging replica cannot put stale data in the shared cache.
+This includes the whole view of a request that fills the rendered-response
+cache.
+
+A client that sends an unsafe request reads from the primary for the
+next WATCHLIST_REPLICA_PIN_SECONDS, so it reads its own writes while the
+replicas catch up. It is pinned by a cookie and, since token and JWT
+clients rarely keep cookies, by its user id in the watchlist cache, which
+has to be shared by every process for this to hold across them. The user
+is known only once the view has authenticated, so the pin is checked on
+the request's first read rather than in the middleware. Anonymous clients
+without cookies get no such guarantee. A replica whose connection fails
+is skipped for WATCHLIST_REPLICA_RETRY_SECONDS, and its reads go to the
+primary.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+APP_LABEL = "watchlist_app"
+PIN_COOKIE = "watchmate_primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_current = ContextVar("replica_reads", default=None)
+
+# Alias -> time.monotonic() until which the replica is skipped.
+_unavailable = {}
+
+
+def replicas():
+    return list(getattr(settings, "WATCHLIST_REPLICAS", []))
+
+
+def pin_seconds():
+    return getattr(settings, "WATCHLIST_REPLICA_PIN_SECONDS", 5)
+
+
+def retry_seconds():
+    return getattr(settings, "WATCHLIST_REPLICA_RETRY_SECONDS", 30)
+
+
+def pin_key(user_id):
+    return f"replica:pin:user:{user_id}"
+
+
+def _pins():
+    # The watchlist cache, see api.cache.get_cache().
+    return caches[getattr(settings, "WATCHLIST_CACHE_ALIAS", "default")]
+
+
+def _user_id(request):
+    # DRF copies the user it authenticates onto the Django request.
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+def is_pinned(request):
+    """
+    Whether the user of `request` wrote recently enough to read from the
+    primary.
+    """
+    user_id = _user_id(request)
+    return user_id is not None and _pins().get(pin_key(user_id)) is not None
+
+
+class ReplicaReads:
+    def __init__(self, request=None):
+        self.request = request
+        # The alias serving this request, chosen on its first read.
+        self.alias = None
+
+
+@contextmanager
+def replica_reads(request=None):
+    """
+    Send this app's reads in the block to a replica, unless the user of
+    `request` is pinned to the primary.
+    """
+    token = _current.set(ReplicaReads(request))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Send the reads in the block to the primary, even during a replica read.
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def is_available(alias):
+    until = _unavailable.get(alias)
+    if until is not None and time.monotonic() < until:
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        _unavailable[alias] = time.monotonic() + retry_seconds()
+        return False
+    _unavailable.pop(alias, None)
+    return True
+
+
+def choose_replica():
+    """
+    Return a random available replica, or the primary when there is none.
+    """
+    aliases = replicas()
+    random.shuffle(aliases)
+    for alias in aliases:
+        if is_available(alias):
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        reads = _current.get()
+        if reads is None or model._meta.app_label != APP_LABEL:
+            return None
+        if reads.alias is None:
+            if reads.request is not None and is_pinned(reads.request):
+                reads.alias = DEFAULT_DB_ALIAS
+            else:
+                reads.alias = choose_replica()
+        return reads.alias
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, migrated with it.
+        if db in replicas():
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Serve safe requests from the replicas and pin clients that write to
+    the primary. Does nothing while WATCHLIST_REPLICAS is empty.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self.use_replicas(request):
+            return self.pin(request, self.get_response(request))
+        with replica_reads(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not self.use_replicas(request):
+            response = await self.get_response(request)
+            # Resolving request.user may query the session.
+            return await sync_to_async(self.pin)(request, response)
+        with replica_reads(request):
+            return await self.get_response(request)
+
+    def use_replicas(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+            and bool(replicas())
+        )
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS and replicas():
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=pin_seconds(),
+                httponly=True,
+                samesite="Lax",
+            )
+            user_id = _user_id(request)
+            if user_id is not None:
+                _pins().set(pin_key(user_id), 1, pin_seconds())
+        return response
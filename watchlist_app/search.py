@@ -0,0 +1,152 @@
+"""
+SQLite FTS5 index over `WatchList.title` and `StreamPlatform.name`.
+
+The index is an FTS5 table whose rowid is the `WatchList` id. Triggers keep
+it in step with every write to either table, including bulk inserts and
+queryset updates that bypass model signals. `WatchListSearchIndex` maps
+the table for joins from the ORM.
+
+SQLite drops a table's triggers whenever a migration rebuilds that table,
+so `install()` runs after every `migrate` instead of living in a migration.
+The platform trigger also names the watchlist table, which stops SQLite
+from renaming that table mid-rebuild, so `uninstall()` drops the triggers
+before every `migrate`. Migrations that change titles or platform names
+should call `rebuild()`.
+"""
+
+import re
+
+from django.db import connections, models
+
+FTS_TABLE = "watchlist_app_watchlist_fts"
+WATCHLIST_TABLE = "watchlist_app_watchlist"
+PLATFORM_TABLE = "watchlist_app_streamplatform"
+
+_INSERT_ROW = f"""
+    INSERT INTO {FTS_TABLE}(rowid, title, platform)
+    SELECT new.id, new.title, name FROM {PLATFORM_TABLE} WHERE id = new.platform_id;
+"""
+
+SCHEMA = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON {WATCHLIST_TABLE} BEGIN {_INSERT_ROW} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF title, platform_id ON {WATCHLIST_TABLE} BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        {_INSERT_ROW}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON {WATCHLIST_TABLE} BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_platform_update
+    AFTER UPDATE OF name ON {PLATFORM_TABLE} BEGIN
+        UPDATE {FTS_TABLE} SET platform = new.name WHERE rowid IN (
+            SELECT id FROM {WATCHLIST_TABLE} WHERE platform_id = new.id
+        );
+    END
+    """,
+]
+
+
+TRIGGERS = [
+    f"{FTS_TABLE}_insert",
+    f"{FTS_TABLE}_update",
+    f"{FTS_TABLE}_delete",
+    f"{FTS_TABLE}_platform_update",
+]
+
+
+def is_supported(using="default"):
+    return connections[using].vendor == "sqlite"
+
+
+def install(using="default"):
+    """
+    Create the index and its triggers if missing, filling a new index.
+    """
+    if not is_supported(using):
+        return
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        if WATCHLIST_TABLE not in tables:
+            return
+        created = FTS_TABLE not in tables
+        if created:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "title, platform, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        for statement in SCHEMA:
+            cursor.execute(statement)
+    if created:
+        rebuild(using)
+
+
+def uninstall(using="default"):
+    """
+    Drop the triggers, keeping the index itself.
+    """
+    if not is_supported(using):
+        return
+
+    with connections[using].cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def rebuild(using="default"):
+    """
+    Repopulate the whole index from the catalog in one INSERT ... SELECT.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, platform) "
+            f"SELECT w.id, w.title, p.name FROM {WATCHLIST_TABLE} w "
+            f"JOIN {PLATFORM_TABLE} p ON p.id = w.platform_id"
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def match_expression(terms):
+    """
+    Build an FTS5 query matching every word in `terms` as a prefix.
+
+    Words are quoted so user input can never inject FTS5 operators.
+    """
+    words = re.findall(r"\w+", " ".join(terms))
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class DocumentField(models.TextField):
+    """
+    The FTS5 hidden column named after its table, which matches a query
+    against every indexed column.
+    """
+
+
+DocumentField.register_lookup(Match)
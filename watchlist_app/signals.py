@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, post_migrate, pre_migrate
+from django.dispatch import receiver
+
+from .models import WatchList, StreamPlatform, Review
+from .api import cache, response_cache
+from . import search, sqlite
+
+# Caches are invalidated after commit: invalidating them earlier would let a
+# reader cache the rows before the writer's transaction updates and commits
+# them.
+
+
+@receiver([post_save, post_delete], sender=WatchList)
+def invalidate_watchlist(sender, instance=None, using="default", **kwargs):
+    pk, platform_id = instance.pk, instance.platform_id
+
+    def invalidate():
+        response_cache.bump(WatchList)
+        cache.invalidate_watchlists(pk)
+        cache.invalidate_platforms(platform_id)
+
+    transaction.on_commit(invalidate, using=using)
+
+
+@receiver([post_save, post_delete], sender=StreamPlatform)
+def invalidate_platform(sender, instance=None, using="default", **kwargs):
+    pk, saved = instance.pk, kwargs.get("signal") is post_save
+
+    def invalidate():
+        response_cache.bump(StreamPlatform)
+        cache.invalidate_platforms(pk)
+        # Every title embeds its platform name.
+        if saved:
+            cache.invalidate_watchlists(
+                *WatchList.objects.filter(platform_id=pk).values_list("id", flat=True)
+            )
+
+    transaction.on_commit(invalidate, using=using)
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_review_watchlist(sender, instance=None, using="default", **kwargs):
+    watchlist_id = instance.watchlist_id
+
+    def invalidate():
+        # Reviews change avg_rating/number_rating on the title and its platform.
+        response_cache.bump(Review)
+        cache.invalidate_watchlists(watchlist_id)
+        platform_id = (
+            WatchList.objects.filter(id=watchlist_id)
+            .values_list("platform_id", flat=True)
+            .first()
+        )
+        if platform_id is not None:
+            cache.invalidate_platforms(platform_id)
+
+    transaction.on_commit(invalidate, using=using)
+
+
+@receiver(pre_migrate)
+def uninstall_search_triggers(sender, using="default", **kwargs):
+    if sender.name == "watchlist_app":
+        search.uninstall(using)
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using="default", **kwargs):
+    if sender.name == "watchlist_app":
+        search.install(using)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    sqlite.configure(connection)
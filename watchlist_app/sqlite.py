@@ -0,0 +1,90 @@
+"""
+SQLite tuning for concurrent writers.
+
+`configure()` runs on every new SQLite connection and applies
+WATCHLIST_SQLITE_PRAGMAS. With WAL journaling readers no longer block the
+writer, and `synchronous=normal` only syncs at checkpoints; a power loss
+can drop the last transactions but not corrupt the file.
+
+WAL does not remove "database is locked" errors. A transaction that reads
+before it writes fails at once, without waiting out the busy timeout, when
+another connection commits a write in between. `retry_on_lock` runs such a
+transaction again after a randomised, exponentially growing pause.
+"""
+
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+# Primary result codes of sqlite3 errors.
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+def pragmas():
+    return getattr(settings, "WATCHLIST_SQLITE_PRAGMAS", {})
+
+
+def lock_retries():
+    return getattr(settings, "WATCHLIST_SQLITE_LOCK_RETRIES", 5)
+
+
+def configure(connection):
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        for name, value in pragmas().items():
+            try:
+                cursor.execute(f"PRAGMA {name} = {value}")
+            except OperationalError:
+                # A read-only database keeps the journal mode it was
+                # written with.
+                if name != "journal_mode":
+                    raise
+
+
+def is_lock_error(exc):
+    code = getattr(exc.__cause__, "sqlite_errorcode", None)
+    if code is not None:
+        # Extended codes such as SQLITE_BUSY_SNAPSHOT keep the primary code
+        # in their low byte.
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    return "locked" in str(exc)
+
+
+def retry_on_lock(func=None, *, using=None, base_delay=0.01, max_delay=0.5):
+    """
+    Call `func` again when it fails on a SQLite lock, at most
+    WATCHLIST_SQLITE_LOCK_RETRIES times, sleeping up to `base_delay`
+    seconds, doubled on each attempt and capped at `max_delay`.
+
+    `func` has to be the whole transaction: called inside an atomic block
+    on `using`, it is not retried.
+    """
+    if func is None:
+        return functools.partial(
+            retry_on_lock, using=using, base_delay=base_delay, max_delay=max_delay
+        )
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if (
+                    not is_lock_error(exc)
+                    or attempt >= lock_retries()
+                    or transaction.get_connection(using).in_atomic_block
+                ):
+                    raise
+            delay = min(base_delay * 2**attempt, max_delay)
+            time.sleep(random.uniform(delay / 2, delay))
+            attempt += 1
+
+    return wrapper
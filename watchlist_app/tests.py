@@ -1,11 +1,59 @@
+import datetime
+import decimal
+import gzip
+import json
+import sqlite3
+import time
+import tempfile
+import uuid
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import (
+    IntegrityError,
+    OperationalError,
+    connection,
+    connections,
+    router,
+    transaction,
+)
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy
 
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ListSerializer, Serializer
+from rest_framework.test import (
+    APITestCase,
+    APIRequestFactory,
+    APITransactionTestCase,
+)
 from rest_framework.authtoken.models import Token
 
-from . import models
+from . import metrics, models, ratings, routers, search, sqlite
+from .api import (
+    cache,
+    pagination,
+    parsers,
+    renderers,
+    response_cache,
+    serializers,
+    streaming,
+    throttling,
+    values,
+    views,
+)
 
 
 class StreamPlatformsTestCase(APITestCase):
@@ -75,6 +123,34 @@ class WatchListTestCase(APITestCase):
         response = self.client.post(reverse("movie-list"), data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_watchlist_write_by_platform_id(self):
+        self.user.is_staff = True
+        self.user.save()
+        data = {"platform": self.stream.id, "title": "test", "storyline": "test"}
+        response = self.client.post(reverse("movie-list"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["platform"], "stream")
+        self.assertEqual(
+            models.WatchList.objects.get(title="test").platform, self.stream
+        )
+
+        other = models.StreamPlatform.objects.create(
+            name="other", about="other", website="http://example.com"
+        )
+        response = self.client.put(
+            reverse("movie-detail", args=(self.watchlist.id,)),
+            {**data, "platform": other.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.watchlist.refresh_from_db()
+        self.assertEqual(self.watchlist.platform, other)
+
+        response = self.client.post(
+            reverse("movie-list"), {**data, "platform": 0}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_watchlist_list(self):
         response = self.client.get(reverse("movie-detail", args=(self.watchlist.id,)))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -179,3 +255,1780 @@ class ReviewTestCase(APITestCase):
     def test_review_user(self):
         response = self.client.get("/watch/reviews/?username" + self.user.username)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class QueryCountTestCase(APITestCase):
+    platform_count = 20
+    titles_per_platform = 100
+
+    @classmethod
+    def setUpTestData(cls):
+        models.StreamPlatform.objects.bulk_create(
+            models.StreamPlatform(
+                name=f"stream {i}", about="stream", website="http://example.com"
+            )
+            for i in range(cls.platform_count)
+        )
+        models.WatchList.objects.bulk_create(
+            models.WatchList(
+                platform=platform,
+                title=f"movie {platform.id}-{i}",
+                storyline="test movie",
+            )
+            for platform in models.StreamPlatform.objects.all()
+            for i in range(cls.titles_per_platform)
+        )
+        cls.stream = models.StreamPlatform.objects.first()
+        cls.watchlist = models.WatchList.objects.first()
+
+    def setUp(self):
+        # bulk_create() does not send post_save, so drop anything cached by
+        # earlier test cases under the same primary keys.
+        cache.get_cache().clear()
+
+    def test_streamplatform_list_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("streamplatform-list"))
+        self.assertEqual(len(response.data), self.platform_count)
+        self.assertEqual(response.data[0]["watchlist"][0]["platform"], self.stream.name)
+
+    def test_streamplatform_detail_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("streamplatform-detail", args=(self.stream.id,))
+            )
+        self.assertEqual(len(response.data["watchlist"]), self.titles_per_platform)
+
+    def test_streamplatform_av_queries(self):
+        factory = APIRequestFactory()
+        with self.assertNumQueries(2):
+            response = views.StreamPlatformAV.as_view()(factory.get("/"))
+            response.render()
+        with self.assertNumQueries(2):
+            response = views.StreamPlatformDetailAV.as_view()(
+                factory.get("/"), pk=self.stream.id
+            )
+            response.render()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_watchlist_list_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("movie-list"))
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_watchlist_list_keyset_pages(self):
+        seen = []
+        url = reverse("movie-list") + "?size=10"
+        for _ in range(20):
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            seen.extend(movie["id"] for movie in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(len(seen), 200)
+        self.assertEqual(len(set(seen)), 200)
+        self.assertEqual(
+            seen,
+            list(
+                models.WatchList.objects.order_by("created", "id")[:200].values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+
+    def test_watchlist_list_keyset_ties(self):
+        # Equal timestamps are paged on id by the seek itself, never by an
+        # OFFSET.
+        models.WatchList.objects.update(created=self.watchlist.created)
+        seen = []
+        url = reverse("movie-list") + "?size=10"
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                response = self.client.get(url)
+                seen.extend(movie["id"] for movie in response.data["results"])
+                url = response.data["next"]
+        self.assertEqual(
+            seen,
+            list(
+                models.WatchList.objects.order_by("id")[:30].values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        self.assertFalse(any("OFFSET" in query["sql"] for query in queries))
+
+        previous = self.client.get(response.data["previous"])
+        self.assertEqual(
+            [movie["id"] for movie in previous.data["results"]], seen[10:20]
+        )
+
+    def test_watchlist_list_uses_index(self):
+        position = pagination.WatchListCursorPagination()._get_position_from_instance(
+            models.WatchList.objects.order_by("created", "id")[1000], ("created", "id")
+        )
+        plan = (
+            pagination.WatchListCursorPagination()
+            .seek(models.WatchList.objects.order_by("created", "id"), position, False)[
+                :6
+            ]
+            .explain()
+        )
+        self.assertIn("watchlist_created_id_idx", plan)
+        self.assertNotIn("USE TEMP B-TREE", plan)
+
+    def test_watchlist_detail_queries(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse("movie-detail", args=(self.watchlist.id,)))
+
+    def test_watchlist_search_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("search-list"), {"search": "movie"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class DetailCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create_user(username="example", password="password")
+        self.token = Token.objects.get(user__username=self.user)
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream,
+            title="test movie",
+            storyline="test movie",
+            active=True,
+        )
+
+    def test_watchlist_detail_cached(self):
+        url = reverse("movie-detail", args=(self.watchlist.id,))
+        hits = cache.stats.hits
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["title"], "test movie")
+        self.assertEqual(cache.stats.hits, hits + 1)
+
+    def test_streamplatform_detail_cached(self):
+        url = reverse("streamplatform-detail", args=(self.stream.id,))
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_object_not_cached(self):
+        url = reverse("movie-detail", args=(self.watchlist.id + 1,))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(
+            cache.get_cache().get(cache.watchlist_key(self.watchlist.id + 1))
+        )
+
+    def test_invalidated_on_save(self):
+        movie_url = reverse("movie-detail", args=(self.watchlist.id,))
+        stream_url = reverse("streamplatform-detail", args=(self.stream.id,))
+        self.client.get(movie_url)
+        self.client.get(stream_url)
+
+        # Entries are deleted once the write commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stream.name = "renamed"
+            self.stream.save()
+        self.assertEqual(self.client.get(movie_url).data["platform"], "renamed")
+        self.assertEqual(self.client.get(stream_url).data["name"], "renamed")
+
+    def test_invalidated_on_review(self):
+        url = reverse("movie-detail", args=(self.watchlist.id,))
+        self.client.get(url)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("review-create", args=(self.watchlist.id,)),
+                {"rating": 4, "description": "good", "active": True},
+                format="json",
+            )
+        response = self.client.get(url)
+        self.assertEqual(response.data["number_rating"], 1)
+        self.assertEqual(response.data["avg_rating"], 4)
+
+    def test_invalidated_after_commit(self):
+        url = reverse("movie-detail", args=(self.watchlist.id,))
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                models.Review.objects.create(
+                    review_user=self.user, rating=4, watchlist=self.watchlist
+                )
+                # A read before the rating update commits must not be the
+                # one left in the cache.
+                self.assertEqual(self.client.get(url).data["number_rating"], 0)
+                ratings.review_created(self.watchlist.id, 4, True)
+        self.assertEqual(self.client.get(url).data["number_rating"], 1)
+
+    def test_stats_admin_only(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        response = self.client.get(reverse("cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        # The cached auth user is dropped once the change commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = True
+            self.user.save()
+        response = self.client.get(reverse("cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("hits", response.data)
+
+
+class RatingAggregateTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream,
+            title="test movie",
+            storyline="test movie",
+            active=True,
+        )
+        self.users = [
+            User.objects.create_user(username=f"example{i}", password="password")
+            for i in range(3)
+        ]
+
+    def post_review(self, user, rating):
+        self.client.force_authenticate(user=user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("review-create", args=(self.watchlist.id,)),
+                {"rating": rating, "description": "review", "active": True},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def assertRating(self, avg_rating, number_rating):
+        self.watchlist.refresh_from_db()
+        self.assertAlmostEqual(self.watchlist.avg_rating, avg_rating)
+        self.assertEqual(self.watchlist.number_rating, number_rating)
+        weighted_rating = (
+            (avg_rating * number_rating + 5 * 3.0) / (number_rating + 5)
+            if number_rating
+            else 0
+        )
+        self.assertAlmostEqual(self.watchlist.weighted_rating, weighted_rating)
+
+    def test_create_is_true_mean(self):
+        for user, rating in zip(self.users, [5, 4, 3]):
+            self.post_review(user, rating)
+        self.assertRating(4, 3)
+        self.assertEqual(self.watchlist.total_rating, 12)
+
+    def test_update_and_delete(self):
+        first = self.post_review(self.users[0], 5)
+        self.post_review(self.users[1], 1)
+        self.client.force_authenticate(user=self.users[0])
+
+        response = self.client.put(
+            reverse("review-detail", args=(first,)),
+            {"rating": 3, "description": "review", "active": True},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRating(2, 2)
+
+        response = self.client.delete(reverse("review-detail", args=(first,)))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertRating(1, 1)
+
+    def test_stale_instances(self):
+        first = self.post_review(self.users[0], 5)
+        self.post_review(self.users[1], 1)
+        view = views.ReviewDetail()
+
+        # A concurrent PUT changed the rating after this one loaded the row.
+        stale = models.Review.objects.get(id=first)
+        models.Review.objects.filter(id=first).update(rating=3)
+        ratings.review_updated(self.watchlist.id, 5, 3, True, True)
+        serializer = serializers.ReviewSerializer(
+            stale, data={"rating": 4, "description": "review", "active": True}
+        )
+        serializer.is_valid(raise_exception=True)
+        view.perform_update(serializer)
+        self.assertRating(2.5, 2)
+        self.watchlist.refresh_from_db()
+        self.assertEqual(
+            (self.watchlist.stars_3, self.watchlist.stars_4, self.watchlist.stars_5),
+            (0, 1, 0),
+        )
+
+        # Two DELETEs of the same review.
+        stale = models.Review.objects.get(id=first)
+        serializer = serializers.ReviewSerializer(
+            models.Review.objects.get(id=first),
+            data={"rating": 2, "description": "review", "active": True},
+        )
+        serializer.is_valid(raise_exception=True)
+        view.perform_destroy(models.Review.objects.get(id=first))
+        view.perform_destroy(stale)
+        self.assertRating(1, 1)
+        self.assertEqual(self.watchlist.stars_4, 0)
+
+        # A PUT of a deleted review does not bring it back.
+        with self.assertRaises(NotFound):
+            view.perform_update(serializer)
+        self.assertFalse(models.Review.objects.filter(id=first).exists())
+        self.assertRating(1, 1)
+
+        models.Review.objects.get().delete()
+        ratings.review_deleted(self.watchlist.id, 1)
+        self.assertRating(0, 0)
+
+    def test_recompute_command(self):
+        for user, rating in zip(self.users, [5, 2, 2]):
+            models.Review.objects.create(
+                review_user=user, rating=rating, watchlist=self.watchlist
+            )
+        self.assertRating(0, 0)
+        url = reverse("movie-detail", args=(self.watchlist.id,))
+        self.assertEqual(self.client.get(url).data["number_rating"], 0)
+        stderr = StringIO()
+        call_command("recompute_ratings", stdout=StringIO(), stderr=stderr)
+        self.assertRating(3, 3)
+        self.assertEqual(self.client.get(url).data["number_rating"], 3)
+        self.assertIn(cache.PROCESS_LOCAL_WARNING, stderr.getvalue())
+
+    def histograms(self):
+        response = self.client.get(reverse("movie-detail", args=(self.watchlist.id,)))
+        return (
+            response.data["rating_histogram"],
+            response.data["active_rating_histogram"],
+        )
+
+    def counts(self, **counts):
+        return {str(stars): counts.get(f"s{stars}", 0) for stars in range(1, 6)}
+
+    def test_histogram(self):
+        first = self.post_review(self.users[0], 5)
+        second = self.post_review(self.users[1], 5)
+        self.post_review(self.users[2], 2)
+        self.assertEqual(self.histograms(), (self.counts(s2=1, s5=2),) * 2)
+
+        self.client.force_authenticate(user=self.users[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                reverse("review-detail", args=(first,)),
+                {"rating": 3, "description": "review", "active": False},
+                format="json",
+            )
+        self.assertEqual(
+            self.histograms(),
+            (self.counts(s2=1, s3=1, s5=1), self.counts(s2=1, s5=1)),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                reverse("review-detail", args=(first,)),
+                {"rating": 3, "description": "review", "active": True},
+                format="json",
+            )
+        self.assertEqual(self.histograms(), (self.counts(s2=1, s3=1, s5=1),) * 2)
+
+        self.client.force_authenticate(user=self.users[1])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("review-detail", args=(second,)))
+        self.assertEqual(self.histograms(), (self.counts(s2=1, s3=1),) * 2)
+
+        # The backfill agrees with the incremental updates.
+        columns = ratings.HISTOGRAM_COLUMNS
+        expected = models.WatchList.objects.values_list(*columns).get()
+        models.WatchList.objects.update(stars_2=0, active_stars_3=7)
+        call_command("recompute_histograms", stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(models.WatchList.objects.values_list(*columns).get(), expected)
+
+    def test_histogram_bulk_create(self):
+        other = models.WatchList.objects.create(
+            platform=self.stream, title="other movie", storyline="test movie"
+        )
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.post(
+            reverse("review-bulk-create"),
+            [
+                {"watchlist": self.watchlist.id, "rating": 4},
+                {"watchlist": other.id, "rating": 1, "active": False},
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.histograms(), (self.counts(s4=1),) * 2)
+        other.refresh_from_db()
+        self.assertEqual((other.stars_1, other.active_stars_1), (1, 0))
+
+
+class StreamingTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="example", password="password")
+        self.client.force_authenticate(user=self.user)
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream, title="test movie \u2028", storyline="test movie"
+        )
+        models.WatchList.objects.create(
+            platform=self.stream, title="other movie", storyline="test movie"
+        )
+        models.Review.objects.create(
+            review_user=self.user, rating=4, watchlist=self.watchlist
+        )
+
+    def assertStreamsSameJSON(self, url, **params):
+        expected = self.client.get(url, params)
+        self.assertFalse(expected.streaming)
+        response = self.client.get(url, {"stream": "true", **params})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(b"".join(response.streaming_content), expected.content)
+
+    def test_review_list(self):
+        self.assertStreamsSameJSON(reverse("review-list", args=(self.watchlist.id,)))
+        self.assertStreamsSameJSON(
+            reverse("review-list", args=(self.watchlist.id,)), active="false"
+        )
+
+    def test_user_review(self):
+        url = reverse("user-review-detail")
+        expected = self.client.get(url, {"username": self.user.username})
+        response = self.client.get(
+            url, {"username": self.user.username, "stream": "true"}
+        )
+        self.assertEqual(
+            json.loads(b"".join(response.streaming_content)),
+            expected.json()["results"],
+        )
+
+    def test_streamplatform_list(self):
+        self.assertStreamsSameJSON(reverse("streamplatform-list"))
+
+    def test_watchlist_list(self):
+        response = self.client.get(reverse("movie-list"), {"stream": "1"})
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(
+            [movie["title"] for movie in data], ["test movie \u2028", "other movie"]
+        )
+
+    def test_chunks(self):
+        chunks = list(
+            streaming.iter_json(
+                models.WatchList.objects.order_by("id"),
+                serializers.WatchListSerializer,
+                chunk_size=1,
+            )
+        )
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(json.loads(b"".join(chunks))), 2)
+        empty = streaming.iter_json(
+            models.WatchList.objects.none(), serializers.WatchListSerializer
+        )
+        self.assertEqual(b"".join(empty), b"[]")
+
+
+class FullTextSearchTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.netflix = models.StreamPlatform.objects.create(
+            name="Netflix", about="stream", website="http://example.com"
+        )
+        self.prime = models.StreamPlatform.objects.create(
+            name="Prime", about="stream", website="http://example.com"
+        )
+        self.dark = models.WatchList.objects.create(
+            platform=self.netflix, title="Dark", storyline="test"
+        )
+        self.knight = models.WatchList.objects.create(
+            platform=self.prime, title="The Dark Knight", storyline="test"
+        )
+        self.boys = models.WatchList.objects.create(
+            platform=self.prime, title="The Boys", storyline="test"
+        )
+
+    def search(self, term, **params):
+        response = self.client.get(reverse("search-list"), {"search": term, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie["title"] for movie in response.data["results"]]
+
+    def test_ranked(self):
+        self.assertEqual(self.search("dark"), ["Dark", "The Dark Knight"])
+
+    def test_prefix_and_platform(self):
+        self.assertEqual(self.search("kni"), ["The Dark Knight"])
+        self.assertEqual(self.search("netf"), ["Dark"])
+        self.assertEqual(self.search("prime boy"), ["The Boys"])
+
+    def test_operators_are_literal(self):
+        self.assertEqual(self.search('dark OR "boys'), [])
+        self.assertEqual(len(self.search("")), 3)
+
+    def test_paginated_by_rank(self):
+        first = self.client.get(reverse("search-list"), {"search": "the", "size": 1})
+        second = self.client.get(first.data["next"])
+        titles = {first.data["results"][0]["title"], second.data["results"][0]["title"]}
+        self.assertEqual(titles, {"The Dark Knight", "The Boys"})
+        self.assertIsNone(second.data["next"])
+
+    def test_index_follows_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.boys.title = "Invincible"
+            self.boys.save()
+            self.prime.name = "Hulu"
+            self.prime.save()
+            self.dark.delete()
+            models.WatchList.objects.bulk_create(
+                [models.WatchList(platform=self.netflix, title="Darker", storyline="x")]
+            )
+        self.assertEqual(self.search("invinc"), ["Invincible"])
+        self.assertCountEqual(self.search("hulu"), ["The Dark Knight", "Invincible"])
+        self.assertEqual(self.search("dark"), ["Darker", "The Dark Knight"])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.FTS_TABLE}")
+        self.assertEqual(self.search("dark"), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.search("dark"), ["Dark", "The Dark Knight"])
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse("search-list"), {"search": "dark"})
+
+
+class UserReviewFeedTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="example", password="password")
+        other = User.objects.create_user(username="other", password="password")
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        for i in range(12):
+            watchlist = models.WatchList.objects.create(
+                platform=self.stream, title=f"movie {i}", storyline="test"
+            )
+            models.Review.objects.create(
+                review_user=self.user, rating=i % 5 + 1, watchlist=watchlist
+            )
+            models.Review.objects.create(
+                review_user=other, rating=1, watchlist=watchlist
+            )
+
+    def feed(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json(), len(queries)
+
+    def test_pages(self):
+        page, queries = self.feed(
+            reverse("user-review-detail"), {"username": "example"}
+        )
+        # The user, then the page.
+        self.assertEqual(queries, 2)
+        self.assertEqual(len(page["results"]), 10)
+        self.assertEqual(page["results"][0]["watchlist_title"], "movie 11")
+        self.assertEqual(page["results"][0]["review_user"], "example")
+        self.assertIsNone(page["previous"])
+
+        rest, queries = self.feed(page["next"])
+        self.assertEqual(queries, 2)
+        self.assertEqual(
+            [review["watchlist_title"] for review in rest["results"]],
+            ["movie 1", "movie 0"],
+        )
+        self.assertIsNone(rest["next"])
+
+    def test_pages_through_ties(self):
+        # Reviews created in the same instant are paged on id, without an
+        # OFFSET.
+        models.Review.objects.update(created=timezone.now())
+        titles = []
+        url, params = reverse("user-review-detail"), {"username": "example", "size": 5}
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                page, _ = self.feed(url, params)
+                titles.extend(review["watchlist_title"] for review in page["results"])
+                url, params = page["next"], None
+        self.assertEqual(titles, [f"movie {i}" for i in reversed(range(12))])
+        self.assertFalse(any("OFFSET" in query["sql"] for query in queries))
+
+    def test_unknown_user(self):
+        page, queries = self.feed(reverse("user-review-detail"), {"username": "nobody"})
+        self.assertEqual(page["results"], [])
+        self.assertEqual(queries, 1)
+
+    def test_async(self):
+        params = {"username": "example", "size": 5}
+        sync, _ = self.feed(reverse("user-review-detail"), params)
+        response, _ = self.feed(reverse("async-user-review-detail"), params)
+        self.assertEqual(response["results"], sync["results"])
+
+
+class ReviewIndexTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="example", password="password")
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream, title="test movie", storyline="test movie"
+        )
+
+    def assertUsesIndex(self, queryset, index):
+        self.assertRegex(queryset.explain(), rf"USING (COVERING )?INDEX {index}\b")
+
+    def test_review_list_plan(self):
+        reviews = models.Review.objects.filter(watchlist_id=self.watchlist.id)
+        self.assertUsesIndex(reviews.filter(active=True), "review_watchlist_active_idx")
+        # The unique (watchlist, review_user) constraint is the tighter match.
+        self.assertIn(
+            "(watchlist_id=? AND review_user_id=?)",
+            reviews.filter(active=True, review_user__username="example").explain(),
+        )
+
+    def test_user_review_plan(self):
+        reviews = models.Review.objects.filter(review_user=self.user)
+        plan = reviews.order_by("-created", "-id").explain()
+        self.assertRegex(plan, r"USING (COVERING )?INDEX review_user_feed_idx\b")
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_unique_review_per_user(self):
+        models.Review.objects.create(
+            review_user=self.user, rating=5, watchlist=self.watchlist
+        )
+        with self.assertRaises(IntegrityError):
+            models.Review.objects.create(
+                review_user=self.user, rating=4, watchlist=self.watchlist
+            )
+
+    def test_duplicate_create_single_round_trip(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("review-create", args=(self.watchlist.id,))
+        data = {"rating": 5, "description": "review", "active": True}
+        self.client.post(url, data, format="json")
+
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.watchlist.refresh_from_db()
+        self.assertEqual(self.watchlist.number_rating, 1)
+
+    def test_other_integrity_errors_not_duplicates(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("review-create", args=(self.watchlist.id,))
+        error = IntegrityError("NOT NULL constraint failed: watchlist_app_watchlist.id")
+        with mock.patch.object(ratings, "review_created", side_effect=error):
+            with self.assertRaises(IntegrityError):
+                self.client.post(
+                    url,
+                    {"rating": 5, "description": "x", "active": True},
+                    format="json",
+                )
+        self.assertFalse(models.Review.objects.exists())
+
+
+class TokenBucketThrottleTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="example", password="password")
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream, title="test movie", storyline="test movie"
+        )
+        self.store = throttling.DatabaseThrottleStore()
+
+    def test_burst_then_refill(self):
+        # 3 requests per 60s: one token every 20s.
+        for _ in range(3):
+            self.assertIsNone(self.store.consume("key", 1000.0, 20.0, 60.0))
+        self.assertAlmostEqual(self.store.consume("key", 1000.0, 20.0, 60.0), 20.0)
+        self.assertAlmostEqual(self.store.consume("key", 1015.0, 20.0, 60.0), 5.0)
+        self.assertIsNone(self.store.consume("key", 1020.0, 20.0, 60.0))
+        self.assertIsNone(self.store.consume("other", 1020.0, 20.0, 60.0))
+        self.assertEqual(models.ThrottleBucket.objects.count(), 2)
+
+    def test_idle_bucket_does_not_bank_tokens(self):
+        self.store.consume("key", 1000.0, 20.0, 60.0)
+        for _ in range(3):
+            self.assertIsNone(self.store.consume("key", 5000.0, 20.0, 60.0))
+        self.assertIsNotNone(self.store.consume("key", 5000.0, 20.0, 60.0))
+
+    def test_expire(self):
+        store = throttling.DatabaseThrottleStore(expire_probability=1)
+        store.consume("idle", 1000.0, 20.0, 60.0)
+        store.consume("active", 1000.0, 20.0, 60.0)
+        store.consume("active", 1000.0, 20.0, 60.0)
+        self.assertEqual(store.expire(1030.0), 1)
+        self.assertEqual(
+            list(models.ThrottleBucket.objects.values_list("key", flat=True)),
+            ["active"],
+        )
+        # Creating a bucket expires the passed ones.
+        store.consume("new", 5000.0, 20.0, 60.0)
+        self.assertEqual(
+            list(models.ThrottleBucket.objects.values_list("key", flat=True)), ["new"]
+        )
+
+    def test_contended_consume_bounded(self):
+        # Every insert loses to a concurrent worker whose bucket is gone again.
+        with mock.patch(
+            "django.db.models.query.QuerySet.create", side_effect=IntegrityError
+        ) as create:
+            self.assertEqual(self.store.consume("key", 1000.0, 20.0, 60.0), 20.0)
+        self.assertEqual(create.call_count, self.store.max_attempts)
+
+    def test_cache_store(self):
+        store = throttling.CacheThrottleStore()
+        store.cache.clear()
+        for _ in range(3):
+            self.assertIsNone(store.consume("key", 1000.0, 20.0, 60.0))
+        self.assertAlmostEqual(store.consume("key", 1000.0, 20.0, 60.0), 20.0)
+
+    def test_review_detail_throttled(self):
+        review = models.Review.objects.create(
+            review_user=self.user, rating=5, watchlist=self.watchlist
+        )
+        self.client.force_authenticate(user=self.user)
+        url = reverse("review-detail", args=(review.id,))
+        rates = {
+            **throttling.TokenBucketThrottle.THROTTLE_RATES,
+            "review-detail": "2/min",
+        }
+        throttling.CacheThrottleStore().cache.clear()
+        with mock.patch.object(throttling.TokenBucketThrottle, "THROTTLE_RATES", rates):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(response["Retry-After"], "30")
+            # Reads are throttled in the cache and write nothing.
+            self.assertFalse(models.ThrottleBucket.objects.exists())
+            response = self.client.put(url, {"rating": 4}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(
+            models.ThrottleBucket.objects.filter(
+                key=f"throttle_review-detail_{self.user.pk}"
+            ).exists()
+        )
+
+
+class SeedCatalogTestCase(APITestCase):
+    def test_seed_catalog(self):
+        call_command(
+            "seed_catalog",
+            platforms=3,
+            titles=50,
+            users=10,
+            reviews=120,
+            stdout=StringIO(),
+        )
+        self.assertEqual(models.StreamPlatform.objects.count(), 3)
+        self.assertEqual(models.WatchList.objects.count(), 50)
+        self.assertEqual(models.Review.objects.count(), 120)
+        self.assertEqual(
+            Token.objects.filter(user__username__startswith="user").count(), 10
+        )
+
+        popular = models.WatchList.objects.order_by("-number_rating").first()
+        self.assertEqual(
+            popular.number_rating,
+            models.Review.objects.filter(watchlist=popular).count(),
+        )
+        self.assertGreater(popular.number_rating, 120 / 50)
+
+
+class CatalogImportExportTestCase(APITestCase):
+    def setUp(self):
+        call_command(
+            "seed_catalog",
+            platforms=2,
+            titles=30,
+            users=5,
+            reviews=60,
+            stdout=StringIO(),
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return str(Path(self.tmp.name) / name)
+
+    def write(self, name, text):
+        Path(self.path(name)).write_text(text)
+        return self.path(name)
+
+    def export(self, kind, name):
+        call_command("export_catalog", kind, output=self.path(name), stdout=StringIO())
+        return self.path(name)
+
+    def load(self, kind, path, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_catalog", kind, path, stdout=stdout, stderr=stderr, **options
+        )
+        # Row errors only: the test cache is always process-local.
+        warning = cache.PROCESS_LOCAL_WARNING + "\n"
+        self.assertIn(warning, stderr.getvalue())
+        return stdout.getvalue(), stderr.getvalue().replace(warning, "")
+
+    def test_round_trip(self):
+        titles = list(
+            models.WatchList.objects.order_by("id").values_list(
+                "id", "title", "platform__name", "avg_rating", "number_rating"
+            )
+        )
+        files = {
+            "platforms": self.export("platforms", "platforms.csv"),
+            "watchlists": self.export("watchlists", "watchlists.jsonl"),
+            "reviews": self.export("reviews", "reviews.csv"),
+        }
+        models.StreamPlatform.objects.all().delete()
+        self.assertEqual(models.Review.objects.count(), 0)
+
+        self.load("platforms", files["platforms"], keep_ids=True)
+        self.load("watchlists", files["watchlists"], keep_ids=True, batch_size=7)
+        stdout, stderr = self.load("reviews", files["reviews"], batch_size=7)
+
+        self.assertIn("Imported 60 reviews, skipped 0", stdout)
+        self.assertEqual(stderr, "")
+        self.assertEqual(
+            list(
+                models.WatchList.objects.order_by("id").values_list(
+                    "id", "title", "platform__name", "avg_rating", "number_rating"
+                )
+            ),
+            titles,
+        )
+
+        # Everything already exists now.
+        stdout, stderr = self.load("reviews", files["reviews"])
+        self.assertIn("Imported 0 reviews, skipped 60", stdout)
+
+    def test_skips_bad_rows(self):
+        watchlist = models.WatchList.objects.first()
+        title = {"watchlist": watchlist.title, "platform": watchlist.platform.name}
+        other = {"watchlist": watchlist.title, "platform": "nowhere"}
+        path = self.write(
+            "reviews.jsonl",
+            "\n".join(
+                json.dumps(row)
+                for row in [
+                    {**title, "review_user": "nobody", "rating": 3},
+                    {**other, "review_user": "user0", "rating": 3},
+                    {**title, "review_user": "user0", "rating": 9},
+                    {**title, "review_user": "user0", "rating": 2},
+                    {**title, "review_user": "user0", "rating": 4},
+                ]
+            ),
+        )
+        models.Review.objects.filter(review_user__username="user0").delete()
+
+        stdout, stderr = self.load("reviews", path)
+        self.assertIn("Imported 1 reviews, skipped 4", stdout)
+        self.assertEqual(
+            [line.split(":")[0] for line in stderr.splitlines()],
+            ["line 1", "line 2", "line 3", "line 5"],
+        )
+        review = models.Review.objects.get(
+            watchlist=watchlist, review_user__username="user0"
+        )
+        self.assertEqual(review.rating, 2)
+        watchlist.refresh_from_db()
+        self.assertEqual(
+            watchlist.number_rating,
+            models.Review.objects.filter(watchlist=watchlist).count(),
+        )
+
+    def test_watchlists_resolve_platform_names(self):
+        path = self.write(
+            "titles.csv",
+            "title,storyline,platform,active\n"
+            "imported,story,platform 1,False\n"
+            "orphan,story,missing,\n",
+        )
+        stdout, stderr = self.load("watchlists", path)
+        self.assertIn("Imported 1 watchlists, skipped 1", stdout)
+        self.assertIn("unknown platform 'missing'", stderr)
+        title = models.WatchList.objects.get(title="imported")
+        self.assertEqual(title.platform.name, "platform 1")
+        self.assertFalse(title.active)
+
+    def test_reviews_resolve_titles(self):
+        def catalog():
+            return list(
+                models.WatchList.objects.exclude(title="placeholder")
+                .order_by("title")
+                .values_list("title", "platform__name", "avg_rating", "number_rating")
+            )
+
+        before = catalog()
+        files = {
+            kind: self.export(kind, f"{kind}.jsonl")
+            for kind in ("platforms", "watchlists", "reviews")
+        }
+        models.StreamPlatform.objects.all().delete()
+        # Shift the ids: reviews must follow their title, not its old id.
+        placeholder = models.StreamPlatform.objects.create(
+            name="placeholder", about="x", website="http://example.com"
+        )
+        models.WatchList.objects.create(
+            platform=placeholder, title="placeholder", storyline="x"
+        )
+
+        for kind, path in files.items():
+            stdout, stderr = self.load(kind, path)
+            self.assertEqual(stderr, "")
+        self.assertIn("Imported 60 reviews, skipped 0", stdout)
+        self.assertEqual(catalog(), before)
+
+    def test_malformed_input(self):
+        path = self.write("platforms.jsonl", '{"name": "ok"\n')
+        with self.assertRaises(CommandError):
+            self.load("platforms", path)
+
+
+class ReviewBulkCreateTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="example", password="password")
+        self.client.force_authenticate(user=self.user)
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlists = models.WatchList.objects.bulk_create(
+            models.WatchList(platform=self.stream, title=f"movie {i}", storyline="x")
+            for i in range(20)
+        )
+        models.Review.objects.create(
+            review_user=self.user, rating=1, watchlist=self.watchlists[0]
+        )
+        ratings.recompute()
+
+    def post(self, data):
+        return self.client.post(reverse("review-bulk-create"), data, format="json")
+
+    def test_partial_success(self):
+        first, second = self.watchlists[1].id, self.watchlists[2].id
+        response = self.post(
+            [
+                {"watchlist": first, "rating": 5, "description": "a"},
+                {"watchlist": first, "rating": 4, "description": "duplicate"},
+                {"watchlist": second, "rating": 9, "description": "bad rating"},
+                {"watchlist": self.watchlists[0].id, "rating": 3},
+                {"watchlist": 999999, "rating": 3},
+                {"rating": 3},
+                {"watchlist": second, "rating": 2, "description": "b"},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [review["watchlist"] for review in response.data["created"]],
+            [first, second],
+        )
+        self.assertEqual(
+            [error["index"] for error in response.data["errors"]], [1, 2, 3, 4, 5]
+        )
+        self.assertEqual(response.data["created"][0]["review_user"], "example")
+        self.assertEqual(models.Review.objects.count(), 3)
+
+        for watchlist, avg_rating in [(self.watchlists[1], 5), (self.watchlists[2], 2)]:
+            watchlist.refresh_from_db()
+            self.assertEqual(watchlist.number_rating, 1)
+            self.assertEqual(watchlist.avg_rating, avg_rating)
+
+    def test_queries_per_title(self):
+        # Validation and insert cost a fixed number of queries; the only
+        # per-item work is one aggregate UPDATE per affected title.
+        self.post([{"watchlist": self.watchlists[19].id, "rating": 4}])
+        data = [
+            {"watchlist": watchlist.id, "rating": 4}
+            for watchlist in self.watchlists[1:11]
+        ]
+        # throttle, two lookups, savepoint/insert/release, ten UPDATEs
+        with self.assertNumQueries(1 + 2 + 3 + 10):
+            response = self.post(data)
+        self.assertEqual(len(response.data["created"]), 10)
+
+    def test_rejects_non_list(self):
+        response = self.post({"watchlist": self.watchlists[1].id, "rating": 4})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.post([{"rating": 4}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create_user(username="example", password="password")
+        self.client.force_authenticate(user=self.user)
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream, title="test movie", storyline="test movie"
+        )
+        self.review = models.Review.objects.create(
+            review_user=self.user, rating=4, watchlist=self.watchlist
+        )
+        self.urls = [
+            reverse("movie-list"),
+            reverse("streamplatform-list"),
+            reverse("review-list", args=(self.watchlist.id,)),
+        ]
+
+    def etags(self):
+        return [self.client.get(url)["ETag"] for url in self.urls]
+
+    def test_not_modified(self):
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response["ETag"].startswith('W/"'))
+            self.assertIn("no-cache", response["Cache-Control"])
+
+            # Validated with the version counters alone: nothing is serialized.
+            with mock.patch(
+                "rest_framework.serializers.Serializer.to_representation"
+            ) as to_representation:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            to_representation.assert_not_called()
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response.content, b"")
+            self.assertIn("ETag", response)
+
+    def test_changes_invalidate(self):
+        before = self.etags()
+
+        # A rating change updates the title through ratings._apply().
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                reverse("review-detail", args=(self.review.id,)),
+                {"rating": 2, "description": "changed"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        after_review = self.etags()
+        self.assertTrue(all(a != b for a, b in zip(before, after_review)))
+
+        # Titles embed their platform name.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stream.name = "renamed"
+            self.stream.save()
+        after_rename = self.etags()
+        self.assertNotEqual(after_review[0], after_rename[0])
+        self.assertNotEqual(after_review[1], after_rename[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Review.objects.filter(id=self.review.id).delete()
+        self.assertNotEqual(after_rename[2], self.etags()[2])
+
+    def test_validator_covers_query_string(self):
+        url = reverse("movie-list")
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url + "?size=1", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_validated_without_queries(self):
+        etag = self.client.get(self.urls[0])["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since_alone(self):
+        response = self.client.get(self.urls[0])
+        self.assertNotIn("Last-Modified", response)
+        response = self.client.get(
+            self.urls[0], HTTP_IF_MODIFIED_SINCE=http_date(time.time())
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AsyncViewsTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create_user(username="example", password="password")
+        self.client.force_authenticate(user=self.user)
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlists = [
+            models.WatchList.objects.create(
+                platform=self.stream, title=f"test movie {i}", storyline="test"
+            )
+            for i in range(7)
+        ]
+        self.watchlist = self.watchlists[0]
+        models.Review.objects.create(
+            review_user=self.user, rating=4, watchlist=self.watchlist
+        )
+
+    def assertSameResponse(self, name, args=(), query=""):
+        sync = self.client.get(reverse(name, args=args) + query)
+        cache.get_cache().clear()
+        response = self.client.get(reverse(f"async-{name}", args=args) + query)
+        self.assertEqual(response.status_code, sync.status_code)
+        self.assertEqual(
+            response.content.replace(b"/watch/async/", b"/watch/"), sync.content
+        )
+        return response
+
+    def test_same_responses(self):
+        self.assertSameResponse("movie-detail", args=(self.watchlist.id,))
+        self.assertSameResponse("movie-detail", args=(0,))
+        self.assertSameResponse("streamplatform-list")
+        self.assertSameResponse("streamplatform-detail", args=(self.stream.id,))
+        self.assertSameResponse("streamplatform-detail", args=(0,))
+        self.assertSameResponse("review-list", args=(self.watchlist.id,))
+        self.assertSameResponse(
+            "review-list", args=(self.watchlist.id,), query="?active=false"
+        )
+        self.assertSameResponse("user-review-detail", query="?username=example")
+        response = self.assertSameResponse("search-list", query="?search=movie")
+        self.assertIsNotNone(response.data["next"])
+        self.assertSameResponse("search-list", query="?search=movie&size=10")
+
+    def test_read_only(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.put(
+            reverse("async-movie-detail", args=(self.watchlist.id,)), {}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_conditional_get(self):
+        url = reverse("async-streamplatform-list")
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_throttled(self):
+        self.client.force_authenticate(user=None)
+        url = reverse("async-review-list", args=(self.watchlist.id,))
+        with mock.patch.dict(
+            throttling.TokenBucketThrottle.THROTTLE_RATES, {"anon": "1/day"}
+        ):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS
+            )
+
+
+class TimingMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        metrics.registry.clear()
+        self.user = User.objects.create_user(username="example", password="password")
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream, title="test movie", storyline="test movie"
+        )
+
+    def server_timing(self, response):
+        timings = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, *params = metric.split(";")
+            timings[name] = dict(param.split("=", 1) for param in params)
+        return timings
+
+    def test_server_timing(self):
+        response = self.client.get(reverse("movie-list"))
+        timings = self.server_timing(response)
+        self.assertEqual(set(timings), {"db", "serialize", "render", "total"})
+        self.assertEqual(timings["db"]["desc"], '"1 queries"')
+        self.assertGreater(float(timings["serialize"]["dur"]), 0)
+        self.assertGreater(float(timings["render"]["dur"]), 0)
+        self.assertGreaterEqual(
+            float(timings["total"]["dur"]), float(timings["db"]["dur"])
+        )
+
+        # Served from the cache.
+        url = reverse("movie-detail", args=(self.watchlist.id,))
+        self.client.get(url)
+        timings = self.server_timing(self.client.get(url))
+        self.assertEqual(timings["db"]["desc"], '"0 queries"')
+
+    def test_serializer_timing(self):
+        review = models.Review.objects.create(
+            review_user=self.user, rating=4, watchlist=self.watchlist
+        )
+        for url in [
+            reverse("review-detail", args=(review.id,)),
+            reverse("streamplatform-list"),
+        ]:
+            # Authenticated, so not served by the response cache.
+            self.client.force_authenticate(user=self.user)
+            timings = self.server_timing(self.client.get(url))
+            self.assertGreater(float(timings["serialize"]["dur"]), 0)
+        # DRF's own classes are left alone.
+        self.assertEqual(Serializer.data.fget.__qualname__, "Serializer.data")
+        self.assertEqual(ListSerializer.data.fget.__qualname__, "ListSerializer.data")
+
+    async def test_server_timing_async(self):
+        response = await self.async_client.get(
+            reverse("async-movie-detail", args=(self.watchlist.id,))
+        )
+        self.assertEqual(self.server_timing(response)["db"]["desc"], '"1 queries"')
+
+    def test_metrics_endpoint(self):
+        for _ in range(3):
+            self.client.get(reverse("movie-detail", args=(self.watchlist.id,)))
+
+        url = reverse("metrics")
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        lines = response.content.decode().splitlines()
+        labels = 'route="watch/<int:pk>/",method="GET"'
+        self.assertIn(
+            f'watchmate_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3', lines
+        )
+        self.assertIn(f"watchmate_request_duration_seconds_count{{{labels}}} 3", lines)
+        self.assertIn(f"watchmate_db_queries_total{{{labels}}} 1", lines)
+
+
+class ValuesSerializerTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream é", about="stream", website="http://example.com"
+        )
+        self.watchlists = [
+            models.WatchList.objects.create(
+                platform=self.stream,
+                title=f"movie {i}  ",
+                storyline="test movie",
+                active=bool(i % 2),
+            )
+            for i in range(3)
+        ]
+        for i in range(4):
+            self.add_review(f"user{i}", self.watchlists[0])
+
+    def add_review(self, username, watchlist):
+        user = User.objects.create_user(username=username, password="password")
+        return models.Review.objects.create(
+            review_user=user,
+            watchlist=watchlist,
+            rating=3,
+            description=None if watchlist.reviews.count() % 2 else "good ü",
+        )
+
+    def assertSameOutput(self, queryset, serializer_class, values_class):
+        renderer = JSONRenderer()
+        expected = renderer.render(serializer_class(queryset, many=True).data)
+        rows = list(values_class.values(queryset))
+        self.assertEqual(renderer.render(values_class(rows, many=True).data), expected)
+
+    def test_matches_model_serializer(self):
+        reviews = models.Review.objects.order_by("id")
+        watchlists = models.WatchList.objects.order_by("id")
+        self.assertSameOutput(
+            reviews,
+            serializers.ReviewSerializer,
+            serializers.ReviewValuesSerializer,
+        )
+        self.assertSameOutput(
+            watchlists,
+            serializers.WatchListSerializer,
+            serializers.WatchListValuesSerializer,
+        )
+        with timezone.override("Asia/Kolkata"):
+            self.assertSameOutput(
+                reviews,
+                serializers.ReviewSerializer,
+                serializers.ReviewValuesSerializer,
+            )
+
+    def test_review_list_queries(self):
+        url = reverse("review-list", args=(self.watchlists[0].id,))
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url)
+
+        for i in range(4, 10):
+            self.add_review(f"user{i}", self.watchlists[0])
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(len(after), len(before))
+
+    def test_lookup_required(self):
+        class Broken(values.ValuesSerializer):
+            serializer_class = serializers.ReviewSerializer
+
+        with self.assertRaises(ImproperlyConfigured):
+            Broken.values(models.Review.objects.all())
+
+
+class FastJSONTestCase(APITestCase):
+    data = {
+        "text": "line\u2028separator\u2029 ü",
+        "aware": datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 600, tzinfo=datetime.timezone.utc
+        ),
+        "offset": datetime.datetime(
+            2024,
+            1,
+            2,
+            tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30)),
+        ),
+        "naive": datetime.datetime(2024, 1, 2, 3, 4, 5),
+        "date": datetime.date(2024, 1, 2),
+        "decimal": decimal.Decimal("4.50"),
+        "uuid": uuid.UUID(int=1),
+        "duration": datetime.timedelta(minutes=90),
+        "lazy": gettext_lazy("Not found."),
+        "int keys": {1: True, 2: None},
+        "big": 2**70,
+        "nested": [{"avg_rating": 3.5, "number_rating": 2}],
+    }
+
+    def assertMatchesJSONRenderer(self, data):
+        expected = JSONRenderer().render(data)
+        self.assertEqual(renderers.dumps(data), expected)
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(renderers.dumps(data), expected)
+
+    def test_matches_json_renderer(self):
+        self.assertMatchesJSONRenderer(self.data)
+        self.assertMatchesJSONRenderer([])
+
+    def test_indent_falls_back(self):
+        renderer = renderers.FastJSONRenderer()
+        body = renderer.render({"a": [1]}, "application/json; indent=2")
+        self.assertEqual(body, b'{\n  "a": [\n    1\n  ]\n}')
+        self.assertEqual(renderer.render(None), b"")
+
+    def parse(self, body):
+        return parsers.FastJSONParser().parse(BytesIO(body), "application/json")
+
+    def test_parser(self):
+        body = '{"description": "ü\u2028", "rating": 5, "items": [1.5, null]}'.encode()
+        expected = {"description": "ü\u2028", "rating": 5, "items": [1.5, None]}
+        self.assertEqual(self.parse(body), expected)
+        for invalid in (b"{", b"NaN", b'{"rating": Infinity}', b""):
+            with self.assertRaises(ParseError):
+                self.parse(invalid)
+
+        with mock.patch.object(parsers, "orjson", None):
+            self.assertEqual(self.parse(body), expected)
+            with self.assertRaises(ParseError):
+                self.parse(b"NaN")
+
+    def test_malformed_request_body(self):
+        user = User.objects.create_user(username="example", password="password")
+        self.client.force_authenticate(user=user)
+        response = self.client.post(
+            reverse("review-bulk-create"), data=b"[", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.data["detail"].startswith("JSON parse error"))
+
+
+class LeaderboardTestCase(APITestCase):
+    def setUp(self):
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.other = models.StreamPlatform.objects.create(
+            name="other", about="stream", website="http://example.com"
+        )
+        self.users = [
+            User.objects.create_user(username=f"example{i}", password="password")
+            for i in range(10)
+        ]
+
+    def add_title(self, title, ratings_given, platform=None, active=True):
+        watchlist = models.WatchList.objects.create(
+            platform=platform or self.stream,
+            title=title,
+            storyline="test movie",
+            active=active,
+        )
+        for user, rating in zip(self.users, ratings_given):
+            self.client.force_authenticate(user=user)
+            response = self.client.post(
+                reverse("review-create", args=(watchlist.id,)),
+                {"rating": rating, "description": "review"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(user=None)
+        return watchlist
+
+    def top(self, pk, **params):
+        return self.client.get(reverse("streamplatform-top", args=(pk,)), params)
+
+    def test_min_votes_weighting(self):
+        popular = self.add_title("popular", [4] * 10)
+        single = self.add_title("single", [5])
+        mixed = self.add_title("mixed", [5, 5, 4, 2])
+        self.add_title("unrated", [])
+        self.add_title("inactive", [5] * 10, active=False)
+        self.add_title("elsewhere", [5] * 10, platform=self.other)
+
+        with self.assertNumQueries(2):
+            response = self.top(self.stream.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # (40 + 15) / 15, (16 + 15) / 9 and (5 + 15) / 6.
+        self.assertEqual(
+            [movie["id"] for movie in response.data], [popular.id, mixed.id, single.id]
+        )
+        self.assertAlmostEqual(response.data[0]["weighted_rating"], 55 / 15)
+        self.assertEqual(response.data[0]["platform"], "stream")
+
+        response = self.top(self.stream.id, limit=1)
+        self.assertEqual([movie["id"] for movie in response.data], [popular.id])
+
+        # A new review moves its title right away.
+        self.client.force_authenticate(user=self.users[-1])
+        self.client.post(
+            reverse("review-create", args=(single.id,)),
+            {"rating": 5, "description": "review"},
+            format="json",
+        )
+        response = self.top(self.stream.id)
+        self.assertEqual(
+            [movie["id"] for movie in response.data], [popular.id, single.id, mixed.id]
+        )
+
+        scores = dict(models.WatchList.objects.values_list("id", "weighted_rating"))
+        call_command("recompute_ratings", stdout=StringIO(), stderr=StringIO())
+        for pk, score in models.WatchList.objects.values_list("id", "weighted_rating"):
+            self.assertAlmostEqual(score, scores[pk])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.top(0).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.top("abc").status_code, status.HTTP_404_NOT_FOUND)
+        for limit in ("0", "-1", "ten"):
+            response = self.top(self.stream.id, limit=limit)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_uses_index(self):
+        plan = (
+            models.WatchList.objects.filter(
+                platform=self.stream, active=True, weighted_rating__gt=0
+            )
+            .order_by("-weighted_rating", "id")[:10]
+            .explain()
+        )
+        self.assertIn("watchlist_leaderboard_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+@override_settings(WATCHLIST_REPLICAS=["replica"])
+class ReplicaRouterTestCase(APITransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.replica_path = Path(cls.tmp.name) / "replica.sqlite3"
+        # A read-only copy of the test database, added after setUpClass()
+        # so that neither the test runner nor the flush between tests
+        # manages it.
+        connections.settings["replica"] = connections.configure_settings(
+            {
+                "default": dict(connections.settings["default"]),
+                "replica": {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": f"file:{cls.replica_path}?mode=ro",
+                    "OPTIONS": {"uri": True},
+                },
+            }
+        )["replica"]
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.get_cache().clear()
+        routers._unavailable.clear()
+        self.user = User.objects.create_user(username="example", password="password")
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream, title="replicated", storyline="test"
+        )
+        self.copy_to_replica()
+        models.WatchList.objects.filter(id=self.watchlist.id).update(title="primary")
+
+    def copy_to_replica(self):
+        connections["replica"].close()
+        connection.ensure_connection()
+        with sqlite3.connect(self.replica_path) as target:
+            connection.connection.backup(target)
+        target.close()
+
+    def titles(self, client=None):
+        # Anonymous lists come from the response cache, filled from the
+        # primary; a token keeps the request on the replicas.
+        response = (client or self.client).get(
+            reverse("movie-list"),
+            HTTP_AUTHORIZATION=f"Token {self.user.auth_token.key}",
+        )
+        return [movie["title"] for movie in response.data["results"]]
+
+    def test_safe_requests_read_replica(self):
+        self.assertEqual(self.titles(), ["replicated"])
+        # Outside a request, and for other apps, reads use the primary.
+        self.assertEqual(models.WatchList.objects.get().title, "primary")
+        with routers.replica_reads():
+            self.assertEqual(models.WatchList.objects.get().title, "replicated")
+            self.assertEqual(User.objects.db_manager().db, "default")
+
+    def test_pinned_after_write(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse("review-create", args=(self.watchlist.id,)),
+            {"rating": 5, "description": "review", "active": True},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+        self.assertEqual(self.titles(), ["primary"])
+
+        # Token clients often drop cookies: the user itself is pinned.
+        self.client.cookies.pop(routers.PIN_COOKIE)
+        self.assertEqual(self.titles(), ["primary"])
+        other = User.objects.create_user(username="other", password="password")
+        response = self.client_class().get(
+            reverse("movie-list"), HTTP_AUTHORIZATION=f"Token {other.auth_token.key}"
+        )
+        self.assertEqual(response.data["results"][0]["title"], "replicated")
+
+        cache.get_cache().delete(routers.pin_key(self.user.id))
+        self.assertEqual(self.titles(), ["replicated"])
+
+    def test_cache_filled_from_primary(self):
+        response = self.client.get(reverse("movie-detail", args=(self.watchlist.id,)))
+        self.assertEqual(response.data["title"], "primary")
+
+    def test_response_cache_filled_from_primary(self):
+        response = self.client.get(reverse("movie-list"))
+        self.assertEqual(response.data["results"][0]["title"], "primary")
+        self.assertEqual(self.titles(), ["replicated"])
+
+    def test_unavailable_replica(self):
+        connections["replica"].close()
+        self.replica_path.unlink()
+        self.assertEqual(self.titles(), ["primary"])
+        self.assertIn("replica", routers._unavailable)
+        # Skipped without another connection attempt until the retry time.
+        with mock.patch.object(connections["replica"], "ensure_connection") as ensure:
+            self.assertEqual(self.titles(), ["primary"])
+        ensure.assert_not_called()
+
+    def test_no_migrations_on_replicas(self):
+        self.assertFalse(router.allow_migrate("replica", "watchlist_app"))
+        self.assertTrue(router.allow_migrate("default", "watchlist_app"))
+
+
+class SQLiteTestCase(APITransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="example", password="password")
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream, title="test movie", storyline="test movie"
+        )
+
+    @override_settings(
+        WATCHLIST_SQLITE_PRAGMAS=settings.DATABASE_PROFILES["production"]["PRAGMAS"]
+    )
+    def test_pragmas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings_dict = connections.configure_settings(
+                {"default": {"ENGINE": "django.db.backends.sqlite3"}}
+            )["default"]
+            settings_dict["NAME"] = str(Path(tmp) / "db.sqlite3")
+            wrapper = DatabaseWrapper(settings_dict, alias="pragmas")
+            try:
+                with wrapper.cursor() as cursor:
+                    values = {}
+                    for name in ["journal_mode", "synchronous", "temp_store"]:
+                        cursor.execute(f"PRAGMA {name}")
+                        values[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+        # synchronous NORMAL is 1, temp_store MEMORY is 2.
+        self.assertEqual(
+            values, {"journal_mode": "wal", "synchronous": 1, "temp_store": 2}
+        )
+
+    @mock.patch("time.sleep")
+    def test_retry_on_lock(self, sleep):
+        calls = []
+
+        @sqlite.retry_on_lock
+        def write(error):
+            calls.append(error)
+            if len(calls) < 3:
+                raise OperationalError(error)
+            return "done"
+
+        self.assertEqual(write("database is locked"), "done")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+        calls.clear()
+        with self.assertRaises(OperationalError):
+            write("no such table")
+        self.assertEqual(len(calls), 1)
+
+        calls.clear()
+        with self.settings(WATCHLIST_SQLITE_LOCK_RETRIES=1):
+            with self.assertRaises(OperationalError):
+                write("database is locked")
+        self.assertEqual(len(calls), 2)
+
+        # Inside a transaction only the caller can retry.
+        calls.clear()
+        with transaction.atomic(), self.assertRaises(OperationalError):
+            write("database is locked")
+        self.assertEqual(len(calls), 1)
+
+    @mock.patch("time.sleep")
+    def test_review_create_retried(self, sleep):
+        review_created = ratings.review_created
+        attempts = []
+
+        def locked_once(*args):
+            # The review is inserted by then and must be rolled back.
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise OperationalError("database is locked")
+            return review_created(*args)
+
+        self.client.force_authenticate(user=self.user)
+        with mock.patch.object(ratings, "review_created", side_effect=locked_once):
+            response = self.client.post(
+                reverse("review-create", args=(self.watchlist.id,)),
+                {"rating": 5, "description": "review", "active": True},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(models.Review.objects.count(), 1)
+        self.watchlist.refresh_from_db()
+        self.assertEqual(self.watchlist.number_rating, 1)
+
+
+class ResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create_user(username="example", password="password")
+        self.token = Token.objects.get(user__username=self.user)
+        self.stream = models.StreamPlatform.objects.create(
+            name="stream", about="stream", website="http://example.com"
+        )
+        self.watchlist = models.WatchList.objects.create(
+            platform=self.stream, title="test movie", storyline="test movie"
+        )
+        self.url = reverse("movie-list")
+
+    def assertServedByView(self, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, *args, **kwargs)
+        self.assertTrue(queries.captured_queries)
+        return response
+
+    def titles(self, response):
+        return [movie["title"] for movie in json.loads(response.content)["results"]]
+
+    def test_anonymous_list_cached(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Content-Type"], first["Content-Type"])
+        # Other query strings are other entries.
+        self.assertServedByView({"size": 1})
+
+    def test_writes_retire_entries(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stream.name = "renamed"
+            self.stream.save()
+        response = self.assertServedByView()
+        self.assertEqual(
+            json.loads(response.content)["results"][0]["platform"], "renamed"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Review.objects.create(
+                review_user=self.user, rating=4, watchlist=self.watchlist
+            )
+        self.assertServedByView()
+
+        # Writes without signals bump the versions themselves.
+        models.WatchList.objects.update(title="updated")
+        self.assertEqual(self.titles(self.client.get(self.url)), ["test movie"])
+        response_cache.bump(models.WatchList)
+        self.assertEqual(self.titles(self.client.get(self.url)), ["updated"])
+
+    def test_bumped_after_commit(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.stream.name = "renamed"
+                self.stream.save()
+                # Filled before the write commits: stored under the old
+                # version, which the commit retires.
+                self.client.get(self.url)
+        self.assertServedByView()
+
+    def test_evicted_version(self):
+        self.client.get(self.url)
+        cache.get_cache().delete(response_cache.VERSION_KEYS[models.WatchList])
+        self.assertServedByView()
+        response_cache.bump(models.WatchList)
+        self.assertServedByView()
+
+    def test_bypassed(self):
+        self.client.get(self.url)
+        self.assertServedByView(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.assertServedByView(HTTP_IF_NONE_MATCH='"etag"')
+        self.client.get(self.url, {"stream": "true"})
+        response = self.client.get(self.url, {"stream": "true"})
+        self.assertTrue(response.streaming)
+
+    @override_settings(WATCHLIST_RESPONSE_CACHE_GZIP=True)
+    def test_gzip(self):
+        models.WatchList.objects.bulk_create(
+            [
+                models.WatchList(
+                    platform=self.stream, title=f"movie {i}", storyline="x"
+                )
+                for i in range(5)
+            ]
+        )
+        response_cache.bump(models.WatchList)
+        self.client.get(self.url)
+        plain = self.client.get(self.url)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+        self.assertEqual(int(plain["Content-Length"]), len(plain.content))
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertFalse(self.client.get(self.url).has_header("Content-Encoding"))
@@ -0,0 +1,61 @@
+"""
+Flat row files in JSONL or CSV, read and written by the management commands
+of every app.
+"""
+
+import csv
+import json
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+FORMATS = ("jsonl", "csv")
+
+
+def guess_format(path, format=None):
+    if format:
+        return format
+    suffix = Path(path).suffix.lstrip(".")
+    return suffix if suffix in FORMATS else "jsonl"
+
+
+def read_rows(stream, format):
+    """
+    Yield `(line, row)` pairs from a JSONL or CSV stream.
+
+    CSV cells are strings; empty cells become `None` so that model defaults
+    and nullable fields behave as they do for JSONL.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {
+                key: value if value != "" else None for key, value in row.items()
+            }
+        return
+
+    for line, text in enumerate(stream, 1):
+        if text.strip():
+            yield line, json.loads(text)
+
+
+class RowWriter:
+    def __init__(self, stream, format, fields):
+        self.stream = stream
+        self.fields = fields
+        if format == "csv":
+            self.csv = csv.writer(stream)
+            self.csv.writerow(fields)
+        else:
+            self.csv = None
+            self.encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def write(self, values):
+        if self.csv is not None:
+            self.csv.writerow(
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in values
+            )
+        else:
+            row = dict(zip(self.fields, values))
+            self.stream.write(self.encoder.encode(row) + "\n")
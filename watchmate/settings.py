@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,7 +46,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so that its timings cover the rest of the stack.
+    "watchlist_app.metrics.TimingMiddleware",
+    "watchlist_app.routers.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "watchlist_app.api.response_cache.ResponseCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -78,11 +83,108 @@ WSGI_APPLICATION = "watchmate.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Database profiles, picked with the WATCHMATE_DB_PROFILE environment
+# variable. "production" tunes SQLite for concurrent writers, see
+# watchlist_app.sqlite: WAL journaling and the pragmas below, and
+# connections kept across requests. Persistent connections are for WSGI
+# workers only. Under ASGI each request may run its queries on a new
+# thread, which would keep a connection of its own, so ASGI deployments
+# leave the variable unset.
+DATABASE_PROFILES = {
+    "default": {"CONN_MAX_AGE": 0, "PRAGMAS": {}},
+    "production": {
+        "CONN_MAX_AGE": 600,
+        "PRAGMAS": {
+            "journal_mode": "wal",
+            "synchronous": "normal",
+            # Negative sizes are in KiB: 64 MB of page cache per connection.
+            "cache_size": -64000,
+            "mmap_size": 256 * 2**20,
+            "temp_store": "memory",
+        },
+    },
+}
+DATABASE_PROFILE = DATABASE_PROFILES[os.environ.get("WATCHMATE_DB_PROFILE", "default")]
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "CONN_MAX_AGE": DATABASE_PROFILE["CONN_MAX_AGE"],
+        "CONN_HEALTH_CHECKS": DATABASE_PROFILE["CONN_MAX_AGE"] > 0,
+    },
+    # A read replica, here a copy of db.sqlite3 opened read-only. List it
+    # in WATCHLIST_REPLICAS to use it.
+    # "replica": {
+    #     "ENGINE": "django.db.backends.sqlite3",
+    #     "NAME": f"file:{BASE_DIR / 'replica.sqlite3'}?mode=ro",
+    #     "OPTIONS": {"uri": True},
+    #     "TEST": {"MIRROR": "default"},
+    # },
+}
+
+# Applied to every SQLite connection, see watchlist_app.sqlite.
+WATCHLIST_SQLITE_PRAGMAS = DATABASE_PROFILE["PRAGMAS"]
+# Attempts after the first for review writes that hit a lock.
+WATCHLIST_SQLITE_LOCK_RETRIES = 5
+
+DATABASE_ROUTERS = ["watchlist_app.routers.ReplicaRouter"]
+
+# Aliases that serve the reads of safe watchlist requests, see
+# watchlist_app.routers.
+WATCHLIST_REPLICAS = []
+# After a write, a client reads from the primary for this many seconds.
+WATCHLIST_REPLICA_PIN_SECONDS = 5
+# An unreachable replica is skipped for this many seconds.
+WATCHLIST_REPLICA_RETRY_SECONDS = 30
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# LocMemCache evicts least-recently-used entries once MAX_ENTRIES is reached.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # import_catalog and the recompute commands invalidate this cache from
+    # their own process. They only reach the server's entries, and those of
+    # other workers, through a shared backend such as Redis or Memcached.
+    "watchlist": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "watchlist",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+    # Resolved users for the cached authentication classes. The short TTL
+    # bounds how long another worker can accept a token after logout.
+    "auth": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "auth",
+        "TIMEOUT": 60,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+WATCHLIST_CACHE_ALIAS = "watchlist"
+
+# Rendered anonymous list responses, see watchlist_app.api.response_cache.
+WATCHLIST_RESPONSE_CACHE_TIMEOUT = 300
+# Also store a gzipped copy of each response.
+WATCHLIST_RESPONSE_CACHE_GZIP = True
+
+AUTH_CACHE_ALIAS = "auth"
+
+# Storage for the token-bucket review throttles, shared by all workers.
+THROTTLE_STORE = {
+    "BACKEND": "watchlist_app.api.throttling.DatabaseThrottleStore",
+    "OPTIONS": {"using": "default"},
+}
+# Safe requests are throttled in a cache instead, so that reads do not take
+# the SQLite write lock. Shared by all workers only with a shared backend.
+READ_THROTTLE_STORE = {
+    "BACKEND": "watchlist_app.api.throttling.CacheThrottleStore",
+    "OPTIONS": {"alias": "default"},
 }
 
 
@@ -138,9 +240,9 @@ REST_FRAMEWORK = {
     #     "rest_framework.permissions.IsAuthenticated",
     # ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "user_app.api.authentication.CachedTokenAuthentication",
         #         "rest_framework.permissions.IsAuthenticated",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user_app.api.authentication.ClaimsJWTAuthentication",
     ],
     # "DEFAULT_THROTTLE_CLASSES": [
     #     "rest_framework.throttling.AnonRateThrottle",
@@ -153,10 +255,16 @@ REST_FRAMEWORK = {
         "review-list": "100/day",
         "review-detail": "100/day",
     },
+    # orjson-backed when it is installed, see watchlist_app.api.renderers.
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "watchlist_app.api.renderers.FastJSONRenderer",
     ],
     "DEFAULT_PARSER_CLASSES": [
-        "rest_framework.parsers.JSONParser",
+        "watchlist_app.api.parsers.FastJSONParser",
     ],
 }
+
+SIMPLE_JWT = {
+    # Adds the claims that let ClaimsJWTAuthentication skip the user lookup.
+    "TOKEN_OBTAIN_SERIALIZER": "user_app.api.serializers.ClaimsTokenObtainPairSerializer",
+}